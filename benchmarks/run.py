@@ -0,0 +1,315 @@
+"""Benchmark the OCR pipeline on synthetic scanned PDFs.
+
+Every scenario (page count x DPI x language x noise level) is generated
+once, then run through ``PDFOCRExtractor`` in a fresh child process so its
+peak memory is measured in isolation. Results are printed as a table and
+can be written as JSON; ``--baseline`` compares them with an earlier
+results file and exits with status 1 when a scenario regressed.
+
+Usage:
+    python -m benchmarks.run --output results.json
+    python -m benchmarks.run --quick --baseline results.json
+"""
+
+import sys
+import json
+import time
+import logging
+import argparse
+import platform
+import tempfile
+import multiprocessing
+from itertools import product
+from pathlib import Path
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+from .synthetic import SAMPLE_TEXT, make_scanned_pdf
+
+STAGES = ('render', 'ocr', 'tesseract', 'encode', 'assembly')
+PERCENTILES = (50, 90, 99)
+DEFAULT_TOLERANCE = 0.10
+# Diferencias de latencia menores que esto son ruido de medida
+MIN_LATENCY_DELTA = 0.005
+
+
+class Scenario(NamedTuple):
+    """One synthetic document and how to process it."""
+    pages: int
+    dpi: int
+    language: str
+    noise: float
+
+    @property
+    def name(self) -> str:
+        return f"p{self.pages}-d{self.dpi}-{self.language}-n{self.noise:g}"
+
+
+def build_scenarios(pages: Sequence[int], dpis: Sequence[int], languages: Sequence[str],
+                    noises: Sequence[float]) -> List[Scenario]:
+    """Cross every page count, DPI, language and noise level."""
+    return [Scenario(*values) for values in product(pages, dpis, languages, noises)]
+
+
+def percentile(values: Sequence[float], percent: float) -> float:
+    """Nearest-rank percentile of a non-empty sequence."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * percent // 100))
+    return ordered[int(rank) - 1]
+
+
+def peak_rss_mb() -> Dict[str, Optional[float]]:
+    """
+    Peak resident memory of this process and of its finished children
+    (Tesseract subprocesses), in MB.
+
+    Uses ``resource`` on Unix and psutil's peak working set on Windows,
+    where child processes are not accounted.
+    """
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+            peak = getattr(psutil.Process().memory_info(), 'peak_wset', None)
+        except ImportError:
+            peak = None
+        return {'self': peak / 2 ** 20 if peak else None, 'children': None}
+
+    # ru_maxrss viene en KB en Linux y en bytes en macOS
+    unit = 1 if sys.platform == 'darwin' else 1024
+    return {
+        'self': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit / 2 ** 20,
+        'children': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * unit / 2 ** 20,
+    }
+
+
+def run_scenario(scenario: Scenario, pdf_path: str, overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Process one synthetic PDF and measure it. Runs in a child process.
+
+    Args:
+        scenario: Scenario being measured
+        pdf_path: Its generated PDF
+        overrides: OCRConfig settings shared by every scenario
+
+    Returns:
+        Dict[str, Any]: JSON-serializable measurements
+    """
+    from src.config import OCRConfig
+    from src.ocr_processor import PDFOCRExtractor
+
+    config = OCRConfig({**overrides, 'languages': scenario.language, 'dpi': scenario.dpi})
+    stage_times: Dict[str, List[float]] = {stage: [] for stage in STAGES}
+    failed = 0
+
+    start = time.perf_counter()
+    with PDFOCRExtractor(config) as extractor:
+        results = list(extractor.iter_pages(Path(pdf_path)))
+    elapsed = time.perf_counter() - start
+
+    for result in results:
+        if result.error:
+            failed += 1
+        for stage, seconds in result.timings.items():
+            stage_times.setdefault(stage, []).append(seconds)
+
+    rss = peak_rss_mb()
+    return {
+        'name': scenario.name,
+        'scenario': scenario._asdict(),
+        'pages': len(results),
+        'failed_pages': failed,
+        'wall_seconds': round(elapsed, 4),
+        'pages_per_second': round(len(results) / max(elapsed, 1e-9), 4),
+        'stages': {
+            stage: {
+                **{f"p{p}": round(percentile(times, p), 4) for p in PERCENTILES},
+                'mean': round(sum(times) / len(times), 4),
+            }
+            for stage, times in stage_times.items() if times
+        },
+        'peak_rss_mb': round(rss['self'], 1) if rss['self'] is not None else None,
+        'peak_child_rss_mb': round(rss['children'], 1) if rss['children'] is not None else None,
+    }
+
+
+def run_benchmarks(scenarios: Sequence[Scenario], overrides: Dict[str, Any],
+                   data_dir: Path, seed: int = 0) -> Dict[str, Any]:
+    """
+    Generate and run every scenario.
+
+    Args:
+        scenarios: Scenarios to run
+        overrides: OCRConfig settings shared by every scenario
+        data_dir: Directory for the generated PDFs (reused when present)
+        seed: Random seed for document generation
+
+    Returns:
+        Dict[str, Any]: Environment metadata and per-scenario measurements
+    """
+    results = []
+    context = multiprocessing.get_context('spawn')
+    for scenario in scenarios:
+        pdf_path = data_dir / f"{scenario.name}-s{seed}.pdf"
+        if not pdf_path.exists():
+            make_scanned_pdf(pdf_path, scenario.pages, scenario.dpi, scenario.language, scenario.noise, seed)
+
+        # Un proceso nuevo por escenario para medir su memoria pico por separado
+        with context.Pool(1) as pool:
+            result = pool.apply(run_scenario, (scenario, str(pdf_path), overrides))
+        logging.info(f"{scenario.name}: {result['pages_per_second']:.2f} pages/s")
+        results.append(result)
+
+    return {
+        'meta': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': multiprocessing.cpu_count(),
+            'seed': seed,
+            'settings': overrides,
+        },
+        'scenarios': results,
+    }
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any],
+            tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """
+    Find scenarios that got slower or bigger than the baseline.
+
+    Throughput, every stage's p50 and p90 latency, and peak RSS are compared
+    for scenarios present in both runs.
+
+    Args:
+        current: Results of this run
+        baseline: Results of the reference run
+        tolerance: Relative change allowed before flagging (0.10 = 10%)
+
+    Returns:
+        List[str]: One description per regression
+    """
+    previous = {result['name']: result for result in baseline.get('scenarios', [])}
+    regressions = []
+    for result in current['scenarios']:
+        before = previous.get(result['name'])
+        if before is None:
+            continue
+        name = result['name']
+
+        if result['pages_per_second'] < before['pages_per_second'] * (1 - tolerance):
+            regressions.append(
+                f"{name}: throughput {before['pages_per_second']:.2f} -> {result['pages_per_second']:.2f} pages/s"
+            )
+        for stage, stats in result['stages'].items():
+            old_stats = before.get('stages', {}).get(stage)
+            if not old_stats:
+                continue
+            for key in ('p50', 'p90'):
+                if stats[key] > old_stats[key] * (1 + tolerance) and \
+                        stats[key] - old_stats[key] > MIN_LATENCY_DELTA:
+                    regressions.append(f"{name}: {stage} {key} {old_stats[key]:.3f}s -> {stats[key]:.3f}s")
+        if result['peak_rss_mb'] and before.get('peak_rss_mb') and \
+                result['peak_rss_mb'] > before['peak_rss_mb'] * (1 + tolerance):
+            regressions.append(f"{name}: peak RSS {before['peak_rss_mb']:.0f} -> {result['peak_rss_mb']:.0f} MB")
+    return regressions
+
+
+def format_table(report: Dict[str, Any]) -> str:
+    """Render results as a fixed-width text table."""
+    header = f"{'scenario':<28}{'pages/s':>9}{'render p50':>12}{'ocr p50':>10}{'ocr p90':>10}{'RSS MB':>9}"
+    rows = [header, '-' * len(header)]
+    for result in report['scenarios']:
+        stages = result['stages']
+        rows.append(
+            f"{result['name']:<28}{result['pages_per_second']:>9.2f}"
+            f"{stages.get('render', {}).get('p50', 0):>12.3f}"
+            f"{stages.get('ocr', {}).get('p50', 0):>10.3f}"
+            f"{stages.get('ocr', {}).get('p90', 0):>10.3f}"
+            f"{result['peak_rss_mb'] or 0:>9.0f}"
+        )
+    return '\n'.join(rows)
+
+
+def _int_list(value: str) -> List[int]:
+    return [int(item) for item in value.split(',')]
+
+
+def _float_list(value: str) -> List[float]:
+    return [float(item) for item in value.split(',')]
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the benchmark argument parser."""
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.run', description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=_int_list, default=[4, 16], help="Page counts (default: 4,16)")
+    parser.add_argument('--dpi', type=_int_list, default=[150, 300], help="Resolutions (default: 150,300)")
+    parser.add_argument('--languages', type=lambda v: v.split(','), default=['eng', 'spa'],
+                        help=f"Languages among {', '.join(SAMPLE_TEXT)} (default: eng,spa)")
+    parser.add_argument('--noise', type=_float_list, default=[0.0, 0.1],
+                        help="Noise levels 0-1 (default: 0,0.1)")
+    parser.add_argument('--quick', action='store_true', help="Single small scenario, for smoke runs")
+    parser.add_argument('--seed', type=int, default=0, help="Document generation seed")
+    parser.add_argument('-w', '--workers', type=int, help="OCR workers")
+    parser.add_argument('--pool', help="Worker pool type")
+    parser.add_argument('--engine', help="OCR engine backend")
+    parser.add_argument('--tesseract-cmd', help="Path to the tesseract executable")
+    parser.add_argument('--tessdata-dir', help="Path to the tessdata directory")
+    parser.add_argument('--data-dir', type=Path,
+                        help="Keep generated PDFs here for reuse (default: temporary directory)")
+    parser.add_argument('-o', '--output', type=Path, help="Write results as JSON")
+    parser.add_argument('--baseline', type=Path, help="Results JSON to compare against")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="Relative slowdown flagged as a regression (default: 0.10)")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Run the benchmarks.
+
+    Returns:
+        int: 1 if a regression against the baseline was found, else 0
+    """
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.quick:
+        scenarios = [Scenario(2, 150, 'eng', 0.0)]
+    else:
+        scenarios = build_scenarios(args.pages, args.dpi, args.languages, args.noise)
+
+    overrides = {
+        key: value for key, value in {
+            'workers': args.workers,
+            'pool_type': args.pool,
+            'engine': args.engine,
+            'tesseract_cmd': args.tesseract_cmd,
+            'tessdata_dir': args.tessdata_dir,
+        }.items() if value is not None
+    }
+
+    if args.data_dir:
+        report = run_benchmarks(scenarios, overrides, args.data_dir, args.seed)
+    else:
+        with tempfile.TemporaryDirectory() as data_dir:
+            report = run_benchmarks(scenarios, overrides, Path(data_dir), args.seed)
+
+    print(format_table(report))
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2), encoding='utf-8')
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding='utf-8'))
+        regressions = compare(report, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print(f"No regressions against {args.baseline}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
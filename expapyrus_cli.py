@@ -0,0 +1,10 @@
+"""
+Expapyrus: From physical images to digital text.
+Headless batch entry point (no GUI).
+"""
+
+import sys
+from src.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,10 @@
+"""
+Expapyrus: From physical images to digital text.
+Distributed coordinator/worker entry point (no GUI).
+"""
+
+import sys
+from src.distributed import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,10 @@
+"""
+Expapyrus: From physical images to digital text.
+Full-text index search entry point (no GUI).
+"""
+
+import sys
+from src.index import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,10 @@
+"""
+Expapyrus: From physical images to digital text.
+Local OCR job server entry point (no GUI).
+"""
+
+import sys
+from src.server import main
+
+if __name__ == "__main__":
+    sys.exit(main())
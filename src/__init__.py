@@ -7,7 +7,9 @@ Version: 1.1.0
 License: SOLO (Single Owner Licensing Option)
 """
 
+import atexit
 import logging
+import importlib
 from pathlib import Path
 from typing import Dict, Any
 
@@ -47,24 +49,36 @@ def setup_logging() -> None:
     
     logging.info(f"Initializing {metadata['name']} v{__version__}")
 
-# Expose main classes and functions
-from .config import OCRConfig
-from .ocr_processor import PDFOCRExtractor
-from .gui import ExpapyrusGUI
+# Main classes, imported from their modules on first access so that
+# importing the package stays cheap and never loads tkinter or pdf2image
+_LAZY_ATTRIBUTES = {
+    'OCRConfig': '.config',
+    'PDFOCRExtractor': '.ocr_processor',
+    'AsyncPDFOCRExtractor': '.async_processor',
+    'ExpapyrusGUI': '.gui',
+}
+
 
-# Initialize package
-setup_logging()
+def __getattr__(name: str) -> Any:
+    """Import the main classes on first access."""
+    if name in _LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Define what gets imported with 'from expapyrus import *'
 __all__ = [
     'OCRConfig',
     'PDFOCRExtractor',
+    'AsyncPDFOCRExtractor',
     'ExpapyrusGUI',
     '__version__',
     '__author__',
     '__email__',
     '__license__',
-    'metadata'
+    'metadata',
+    'initialize'
 ]
 
 # Optional: Package initialization code
@@ -99,12 +113,6 @@ def initialize_package() -> None:
         logging.error(f"Failed to initialize package: {e}")
         raise
 
-# Run initialization
-try:
-    initialize_package()
-except Exception as e:
-    logging.error(f"Package initialization failed: {e}")
-
 def get_version() -> str:
     """Return the current version of the package."""
     return __version__
@@ -156,6 +164,20 @@ def cleanup() -> None:
     except Exception as e:
         logging.error(f"Cleanup failed: {e}")
 
-# Register cleanup function to be called on exit
-import atexit
-atexit.register(cleanup)
\ No newline at end of file
+
+def initialize() -> None:
+    """
+    Prepare the working directory for the desktop application.
+
+    Configures logging to ``logs/expapyrus.log``, creates the ``logs``,
+    ``output`` and ``temp`` directories and a default ``settings.json``, and
+    empties ``temp`` on exit. Importing the package does none of this, so
+    headless and worker processes leave the current directory untouched.
+    """
+    setup_logging()
+    try:
+        initialize_package()
+    except Exception as e:
+        logging.error(f"Package initialization failed: {e}")
+    atexit.register(cleanup)
+
@@ -0,0 +1,255 @@
+"""asyncio front end for page-by-page OCR.
+
+``AsyncPDFOCRExtractor`` runs pdfinfo, pdftoppm and Tesseract as asyncio
+subprocesses, so one event loop can drive many documents at once without
+a thread or pool worker per job. A semaphore shared by every document of
+an extractor bounds how many pages are being rendered or recognized at
+the same time. Cancelling the task that consumes ``iter_pages`` kills the
+document's running child processes before its temporary files are
+removed.
+
+Only the rendering and recognition path is covered: adaptive DPI and
+multi-format outputs work as in ``PDFOCRExtractor``, while preprocessing,
+the result cache, checkpoints, the text layer shortcut, blank page
+detection, page deduplication and searchable PDFs need the blocking
+extractor.
+"""
+
+import os
+import re
+import time
+import asyncio
+import logging
+import tempfile
+from collections import deque
+from pathlib import Path
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Sequence
+
+from .engines import EngineSpec, SubprocessEngine, mean_confidence, read_outputs
+from .metrics import MetricsRecorder
+from .ocr_processor import PageResult
+
+# Opciones que el extractor asíncrono no aplica
+UNSUPPORTED_SETTINGS = (
+    'preprocessing', 'cache_dir', 'use_text_layer', 'detect_blank_pages', 'auto_language', 'dedup'
+)
+
+
+async def run_process(command: Sequence[str], env: Optional[Dict[str, str]] = None) -> bytes:
+    """
+    Run a command as an asyncio subprocess and return its standard output.
+
+    The child process is killed if the awaiting task is cancelled.
+
+    Args:
+        command: Program and arguments
+        env: Environment for the child process (inherits ours if None)
+
+    Returns:
+        bytes: Everything the process wrote to stdout
+
+    Raises:
+        RuntimeError: If the process cannot be started or exits with a non-zero status
+    """
+    logging.debug(f"Running: {' '.join(command)}")
+    try:
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            env=env
+        )
+    except OSError as e:
+        raise RuntimeError(f"Could not run {command[0]}: {e}") from e
+    try:
+        stdout, stderr = await process.communicate()
+    finally:
+        if process.returncode is None:
+            # Tarea cancelada: no dejar el proceso hijo huérfano
+            try:
+                process.kill()
+            except ProcessLookupError:
+                pass
+            await process.wait()
+    if process.returncode != 0:
+        name = os.path.basename(command[0])
+        raise RuntimeError(f"{name} error: {stderr.decode('utf-8', errors='replace')}")
+    return stdout
+
+
+class AsyncPDFOCRExtractor:
+    """
+    Extract text from PDFs with asyncio subprocesses.
+
+    Args:
+        config: OCRConfig with the engine, language and rendering settings
+        max_pages_in_flight: Pages rendered or recognized at once across all
+            documents of this extractor (default: ``config.workers``)
+    """
+
+    def __init__(self, config, max_pages_in_flight: Optional[int] = None) -> None:
+        self.config = config
+        self.max_pages_in_flight = max_pages_in_flight or config.workers
+        self.metrics = MetricsRecorder()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        ignored = [name for name in UNSUPPORTED_SETTINGS if getattr(config, name, None)]
+        if ignored:
+            logging.warning(f"Not supported by the asyncio extractor, ignoring: {', '.join(ignored)}")
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """Semaphore bounding in-flight pages, created on first use."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_pages_in_flight)
+        return self._semaphore
+
+    async def process_pdf(self, pdf_path: Path) -> str:
+        """Extract the text of a whole PDF, pages separated by blank lines."""
+        texts = [result.text async for result in self.iter_pages(pdf_path) if result.text is not None]
+        return '\n\n'.join(texts)
+
+    async def iter_pages(self, pdf_path: Path, ordered: bool = True) -> AsyncIterator[PageResult]:
+        """
+        Process a PDF page by page, yielding each page as soon as it is done.
+
+        At most twice ``max_pages_in_flight`` pages of the document are
+        scheduled ahead of the consumer; the shared semaphore decides which
+        of them actually run. A page that fails yields a result with its
+        ``error`` set instead of stopping the document.
+
+        Args:
+            pdf_path: PDF to process
+            ordered: Yield pages in document order rather than completion order
+
+        Yields:
+            PageResult: One result per page
+        """
+        run = self.metrics.start_document(str(pdf_path))
+        total_pages = await self.page_count(pdf_path)
+        spec = self._engine_spec()
+        formats = tuple(self.config.output_formats)
+        window = self.max_pages_in_flight * 2
+        pending: Deque[asyncio.Task] = deque()
+        page_numbers = iter(range(1, total_pages + 1))
+
+        def schedule() -> None:
+            while len(pending) < window:
+                page_number = next(page_numbers, None)
+                if page_number is None:
+                    return
+                pending.append(asyncio.ensure_future(
+                    self._page(str(pdf_path), page_number, temp_dir, spec, formats)
+                ))
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            try:
+                schedule()
+                while pending:
+                    if ordered:
+                        finished = [await pending[0]]
+                        pending.popleft()
+                    else:
+                        done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                        finished = sorted((task.result() for task in done), key=lambda r: r.page_number)
+                        for task in done:
+                            pending.remove(task)
+                    schedule()
+                    for result in finished:
+                        run.page(
+                            result.page_number, result.method, result.error is not None,
+                            result.timings, result.temp_bytes
+                        )
+                        yield result
+                run.finish()
+            finally:
+                for task in pending:
+                    task.cancel()
+                # Esperar a que mueran los procesos antes de borrar el directorio temporal
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def page_count(self, pdf_path: Path) -> int:
+        """Read the page count with pdfinfo."""
+        output = await run_process(['pdfinfo', str(pdf_path)])
+        match = re.search(rb'^Pages:\s*(\d+)', output, re.MULTILINE)
+        if match is None:
+            raise RuntimeError(f"Could not read the page count of {pdf_path}")
+        return int(match.group(1))
+
+    async def _page(self, pdf_path: str, page_number: int, temp_dir: str,
+                    spec: EngineSpec, formats: Sequence[str]) -> PageResult:
+        """Render and recognize one page once the semaphore admits it."""
+        async with self.semaphore:
+            timings: Dict[str, float] = {}
+            temp_bytes = 0
+
+            async def recognize(dpi: int) -> Dict[str, Any]:
+                nonlocal temp_bytes
+                start = time.perf_counter()
+                image_path = await self._render(pdf_path, page_number, dpi, temp_dir)
+                timings['render'] = timings.get('render', 0.0) + time.perf_counter() - start
+                temp_bytes += os.path.getsize(image_path)
+                try:
+                    start = time.perf_counter()
+                    outputs = await self._tesseract(spec, image_path, page_formats)
+                    timings['tesseract'] = timings.get('tesseract', 0.0) + time.perf_counter() - start
+                    return outputs
+                finally:
+                    os.remove(image_path)
+
+            adaptive = self.config.adaptive_dpi
+            page_formats = tuple(formats) + (('tsv',) if adaptive and 'tsv' not in formats else ())
+            dpi = self.config.low_dpi if adaptive else self.config.dpi
+            start = time.perf_counter()
+            try:
+                outputs = await recognize(dpi)
+                if adaptive and mean_confidence(outputs['tsv']) < self.config.confidence_threshold:
+                    logging.debug(f"Page {page_number}: low confidence at {dpi} DPI, re-rendering")
+                    dpi = self.config.dpi
+                    outputs = await recognize(dpi)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(f"Page {page_number} failed: {e}")
+                return PageResult(page_number, error=str(e), timings=timings, temp_bytes=temp_bytes)
+            timings['ocr'] = time.perf_counter() - start
+
+        return PageResult(
+            page_number,
+            outputs['txt'],
+            confidence=mean_confidence(outputs['tsv']) if 'tsv' in outputs else None,
+            dpi=dpi,
+            outputs={name: outputs[name] for name in formats if name != 'txt'},
+            timings=timings,
+            temp_bytes=temp_bytes
+        )
+
+    async def _render(self, pdf_path: str, page_number: int, dpi: int, temp_dir: str) -> str:
+        """Render one page with pdftoppm and return the path of its PPM/PGM image."""
+        output_base = os.path.join(temp_dir, f"page-{page_number}-{dpi}")
+        command = ['pdftoppm', '-r', str(dpi), '-f', str(page_number), '-l', str(page_number), '-singlefile']
+        if self.config.grayscale:
+            command.append('-gray')
+        await run_process(command + [pdf_path, output_base])
+        return f"{output_base}.{'pgm' if self.config.grayscale else 'ppm'}"
+
+    async def _tesseract(self, spec: EngineSpec, image_path: str, formats: Sequence[str]) -> Dict[str, Any]:
+        """Recognize one page image, producing every requested output in one pass."""
+        engine = SubprocessEngine(spec)
+        if list(formats) == ['txt']:
+            stdout = await run_process(engine.build_command(image_path), engine.env)
+            return {'txt': stdout.decode('utf-8')}
+
+        output_base = f"{os.path.splitext(image_path)[0]}.ocr"
+        await run_process(engine.build_command(image_path, output_base) + list(formats), engine.env)
+        return read_outputs(output_base, formats)
+
+    def _engine_spec(self) -> EngineSpec:
+        """Describe the Tesseract command for the current settings."""
+        return EngineSpec(
+            backend=SubprocessEngine.name,
+            tesseract_cmd=self.config.tesseract_cmd,
+            tessdata_dir=self.config.tessdata_dir,
+            languages=self.config.get_languages_string(),
+            # Varias páginas a la vez: un hilo OpenMP por Tesseract
+            single_thread=self.max_pages_in_flight > 1
+        )
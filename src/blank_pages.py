@@ -0,0 +1,39 @@
+"""Detection of blank and near-blank pages on low-resolution thumbnails.
+
+Scanned bundles contain separator sheets and empty backsides. Rendering
+such a page at OCR resolution and running Tesseract on it costs as much as
+a full page of text, so pages are first rendered as small greyscale
+thumbnails and their ink density measured. Single scanner specks vanish
+at thumbnail resolution, while even a few lines of text remain.
+"""
+
+import numpy as np
+
+from .imaging import read_pnm
+
+THUMBNAIL_DPI = 50
+# Píxeles más oscuros que esto cuentan como tinta (escala 0-255)
+INK_LEVEL = 160
+# Fracción del borde ignorada: sombras del escáner, perforaciones, grapas
+MARGIN_FRACTION = 0.05
+THUMBNAIL_BATCH = 32
+
+
+def ink_density(image_path: str, margin: float = MARGIN_FRACTION) -> float:
+    """
+    Fraction of ink pixels in a greyscale thumbnail, ignoring its margins.
+
+    Args:
+        image_path: PGM thumbnail
+        margin: Fraction of width and height ignored at each edge
+
+    Returns:
+        float: Ink fraction between 0 and 1
+    """
+    raster = read_pnm(image_path)
+    image = np.frombuffer(raster.data, dtype=np.uint8).reshape(raster.height, raster.width, raster.channels)
+    top, left = int(raster.height * margin), int(raster.width * margin)
+    inner = image[top:raster.height - top, left:raster.width - left]
+    if inner.size == 0:
+        return 0.0
+    return float((inner.min(axis=2) < INK_LEVEL).mean())
@@ -0,0 +1,133 @@
+"""Content-addressed on-disk cache of OCR results."""
+
+import os
+import json
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(path: str, salt: str = '') -> str:
+    """
+    Hash a file's contents together with an optional salt.
+
+    Args:
+        path: File to hash
+        salt: Extra text mixed into the digest (e.g. OCR options)
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    digest = hashlib.sha256(salt.encode('utf-8'))
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class OCRCache:
+    """
+    Stores OCR results on disk keyed by a hash of the page raster and options.
+
+    Entries are JSON files fanned out into subdirectories by key prefix.
+    Reading an entry refreshes its modification time, and when the cache
+    grows past ``max_size_bytes`` the least recently used entries are
+    removed first. Several processes may share one directory: writes are
+    atomic and eviction tolerates entries vanishing underneath it.
+    """
+
+    def __init__(self, directory: str, max_size_bytes: int) -> None:
+        self.directory = Path(directory)
+        self.max_size_bytes = max_size_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._size = sum(size for _, _, size in self._entries())
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached result.
+
+        Args:
+            key: Cache key from hash_file
+
+        Returns:
+            Optional[Dict[str, Any]]: The stored result, or None on a miss
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+            os.utime(path)
+            return entry
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        """
+        Store a result, evicting old entries if the cache is over its limit.
+
+        Args:
+            key: Cache key from hash_file
+            entry: JSON-serializable result
+        """
+        path = self._path(key)
+        path.parent.mkdir(exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logging.warning(f"Could not write OCR cache entry {key}: {e}")
+            return
+
+        with self._lock:
+            self._size += path.stat().st_size
+            if self._size > self.max_size_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until the cache is 90% full."""
+        entries = sorted(self._entries())
+        self._size = sum(size for _, _, size in entries)
+        target = self.max_size_bytes * 0.9
+        removed = 0
+        for _, path, size in entries:
+            if self._size <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            self._size -= size
+            removed += 1
+        logging.info(f"OCR cache evicted {removed} entries")
+
+    def _entries(self):
+        """Yield (mtime, path, size) for every entry currently on disk."""
+        for path in self.directory.glob('*/*.json'):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            yield stat.st_mtime, path, stat.st_size
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+
+_caches: Dict[Tuple[str, int], OCRCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(directory: str, max_size_bytes: int) -> OCRCache:
+    """Return this process's cache instance for a directory, creating it once."""
+    with _caches_lock:
+        cache = _caches.get((directory, max_size_bytes))
+        if cache is None:
+            cache = _caches[(directory, max_size_bytes)] = OCRCache(directory, max_size_bytes)
+        return cache
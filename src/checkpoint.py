@@ -0,0 +1,127 @@
+"""Per-document checkpoints so interrupted runs can resume."""
+
+import os
+import json
+import hashlib
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional, TextIO
+
+
+def document_fingerprint(pdf_path: Path, settings: Dict[str, Any]) -> str:
+    """
+    Identify a document and the settings it is processed with.
+
+    Uses the file's size and modification time rather than its contents,
+    so fingerprinting a multi-gigabyte scan stays instantaneous.
+
+    Args:
+        pdf_path: Input PDF
+        settings: Options that affect the extracted text
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    stat = os.stat(pdf_path)
+    identity = {
+        'path': str(Path(pdf_path).resolve()),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'settings': settings,
+    }
+    return hashlib.sha256(json.dumps(identity, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+class Checkpoint:
+    """
+    Append-only JSON-lines log of the pages finished for one document.
+
+    The first line holds the document fingerprint; every following line is
+    one finished page. Each page is flushed and fsynced as soon as it is
+    recorded, so at most the page being written is lost on a crash. A
+    checkpoint whose fingerprint does not match the current input or
+    settings is discarded.
+    """
+
+    def __init__(self, path: Path, fingerprint: str) -> None:
+        self.path = Path(path)
+        self.fingerprint = fingerprint
+        self._file: Optional[TextIO] = None
+
+    def load(self) -> Dict[int, Dict[str, Any]]:
+        """
+        Read the pages finished by a previous run.
+
+        Returns:
+            Dict[int, Dict[str, Any]]: Recorded page entries by page number
+        """
+        if not self.path.exists():
+            return {}
+
+        pages: Dict[int, Dict[str, Any]] = {}
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                header = json.loads(f.readline() or '{}')
+                if header.get('fingerprint') != self.fingerprint:
+                    logging.info(f"Discarding stale checkpoint: {self.path}")
+                    return {}
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        # Última línea a medio escribir tras un corte
+                        continue
+                    pages[entry['page_number']] = entry
+        except (OSError, ValueError) as e:
+            logging.warning(f"Could not read checkpoint {self.path}: {e}")
+            return {}
+        return pages
+
+    def record(self, entry: Dict[str, Any]) -> None:
+        """
+        Durably append one finished page.
+
+        Args:
+            entry: JSON-serializable page result with a 'page_number' key
+        """
+        if self._file is None:
+            self._open()
+        self._file.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self) -> None:
+        """Close the checkpoint file, keeping it on disk."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def remove(self) -> None:
+        """Delete the checkpoint once its document is complete."""
+        self.close()
+        try:
+            self.path.unlink()
+        except FileNotFoundError:
+            pass
+
+    def _open(self) -> None:
+        """Open for appending, writing a fresh header unless resuming a valid checkpoint."""
+        resuming = False
+        truncated = False
+        if self.path.exists():
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    resuming = json.loads(f.readline() or '{}').get('fingerprint') == self.fingerprint
+                with open(self.path, 'rb') as f:
+                    f.seek(-1, os.SEEK_END)
+                    truncated = f.read(1) != b'\n'
+            except (OSError, ValueError):
+                resuming = False
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'a' if resuming else 'w', encoding='utf-8')
+        if not resuming:
+            self._file.write(json.dumps({'fingerprint': self.fingerprint}) + '\n')
+        elif truncated:
+            # Cerrar la línea incompleta para no corromper la siguiente
+            self._file.write('\n')
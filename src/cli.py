@@ -0,0 +1,320 @@
+"""Headless command-line interface for batch OCR.
+
+Processes files, directories and glob patterns without loading the GUI
+(tkinter is never imported), running several documents at once on top of
+the extractor's page-level worker pool.
+"""
+
+import sys
+import glob
+import time
+import logging
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from .config import OCRConfig
+from .ocr_processor import PDFOCRExtractor
+from .index import TextIndex
+from .output import PageOutputsWriter, TextOutputWriter
+from .constants import (
+    APP_TITLE,
+    APP_VERSION,
+    CHECKPOINT_SUFFIX,
+    OUTPUT_SUFFIX,
+    PAGE_OUTPUTS_SUFFIX,
+    SEARCHABLE_PDF_SUFFIX,
+    POOL_TYPES,
+    OCR_ENGINES,
+    OUTPUT_FORMATS,
+    PREPROCESSING_STEPS
+)
+
+
+def collect_pdfs(inputs: Sequence[str], recursive: bool = False) -> List[Path]:
+    """
+    Expand files, directories and glob patterns into a list of PDFs.
+
+    Args:
+        inputs: Paths or glob patterns given on the command line
+        recursive: Descend into subdirectories of directory inputs
+
+    Returns:
+        List[Path]: Unique PDF paths in the order they were found
+    """
+    found: List[Path] = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            pattern = '**/*' if recursive else '*'
+            candidates = sorted(p for p in path.glob(pattern) if p.is_file())
+        elif path.is_file():
+            candidates = [path]
+        else:
+            candidates = sorted(Path(p) for p in glob.glob(item, recursive=True))
+            if not candidates:
+                logging.warning(f"No files match: {item}")
+        found.extend(p for p in candidates if p.suffix.lower() == '.pdf')
+
+    unique: Dict[Path, None] = {}
+    for path in found:
+        unique.setdefault(path.resolve(), None)
+    return list(unique)
+
+
+def output_paths(pdf_paths: Sequence[Path], output_dir: Optional[Path]) -> List[Path]:
+    """
+    Choose an output file for every PDF.
+
+    Outputs go next to each PDF unless ``output_dir`` is given. PDFs from
+    different directories that share a name get a numeric suffix so they
+    do not overwrite each other.
+    """
+    used: Dict[Path, int] = {}
+    outputs = []
+    for pdf_path in pdf_paths:
+        directory = output_dir or pdf_path.parent
+        output_path = directory / f"{pdf_path.stem}{OUTPUT_SUFFIX}"
+        count = used.get(output_path, 0)
+        used[output_path] = count + 1
+        if count:
+            output_path = directory / f"{pdf_path.stem}_{count + 1}{OUTPUT_SUFFIX}"
+        outputs.append(output_path)
+    return outputs
+
+
+class BatchStats:
+    """Thread-safe counters for a batch run."""
+
+    def __init__(self) -> None:
+        self.documents = 0
+        self.failed_documents = 0
+        self.pages = 0
+        self.failed_pages = 0
+        self._lock = threading.Lock()
+
+    def add_document(self, pages: int, failed_pages: int) -> None:
+        with self._lock:
+            self.documents += 1
+            self.pages += pages
+            self.failed_pages += failed_pages
+
+    def add_failure(self) -> None:
+        with self._lock:
+            self.failed_documents += 1
+
+    def summary(self, elapsed: float) -> str:
+        elapsed = max(elapsed, 1e-9)
+        return (
+            f"Documents: {self.documents} ok, {self.failed_documents} failed | "
+            f"Pages: {self.pages} ({self.failed_pages} failed) | "
+            f"Time: {elapsed:.1f}s | "
+            f"{self.pages / elapsed:.2f} pages/s, {self.documents / elapsed:.3f} docs/s"
+        )
+
+
+def process_document(extractor: PDFOCRExtractor, pdf_path: Path, output_path: Path,
+                     stats: BatchStats, checkpoint: bool = True,
+                     searchable_pdf: bool = False, index: Optional[TextIndex] = None) -> None:
+    """
+    OCR one PDF into its output file, recording the outcome in ``stats``.
+
+    Unless ``checkpoint`` is False, finished pages are checkpointed next to
+    the output so a rerun of an interrupted batch resumes where it stopped.
+    Extra output formats (hOCR, TSV, PDF) go to a ``<name>_pages``
+    directory beside the text output, one file per page. With
+    ``searchable_pdf``, an image + text PDF named ``<name>_searchable.pdf``
+    is assembled beside it as pages finish. With an ``index``, every page
+    is added to it as it completes and the document's previous entry is
+    replaced once all pages are in.
+    """
+    checkpoint_path = output_path.with_name(output_path.name + CHECKPOINT_SUFFIX) if checkpoint else None
+    # Nombre elegido por output_paths, distinto para PDFs homónimos de otros directorios
+    name = output_path.name[:-len(OUTPUT_SUFFIX)]
+    page_outputs = None
+    if len(extractor.config.output_formats) > 1:
+        page_outputs = PageOutputsWriter(output_path.parent / f"{name}{PAGE_OUTPUTS_SUFFIX}")
+    searchable_path = output_path.parent / f"{name}{SEARCHABLE_PDF_SUFFIX}" if searchable_pdf else None
+    try:
+        document_id = index.begin_document(pdf_path) if index is not None else None
+        pages = failed_pages = 0
+        with TextOutputWriter(output_path) as writer:
+            for result in extractor.iter_pages(pdf_path, checkpoint_path, ordered=False,
+                                               searchable_pdf=searchable_path):
+                pages += 1
+                if result.error:
+                    failed_pages += 1
+                writer.write(result)
+                if page_outputs is not None:
+                    page_outputs.write(result)
+                if index is not None:
+                    index.add_page(document_id, result)
+        if index is not None:
+            index.finish_document(document_id)
+
+        stats.add_document(pages, failed_pages)
+        logging.info(f"Saved {output_path} ({pages} pages, {failed_pages} failed)")
+    except Exception as e:
+        stats.add_failure()
+        logging.error(f"Failed to process {pdf_path}: {e}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command-line argument parser."""
+    parser = argparse.ArgumentParser(
+        prog='expapyrus-cli',
+        description=f"{APP_TITLE} {APP_VERSION} - headless batch OCR for PDFs"
+    )
+    parser.add_argument('inputs', nargs='+', help="PDF files, directories or glob patterns")
+    parser.add_argument('-o', '--output-dir', type=Path,
+                        help="Directory for output files (default: next to each PDF)")
+    parser.add_argument('-r', '--recursive', action='store_true',
+                        help="Search directories recursively")
+    parser.add_argument('-l', '--languages', help="Tesseract languages, e.g. eng+spa")
+    parser.add_argument('--dpi', type=int, help="Render resolution")
+    parser.add_argument('--formats',
+                        help=f"Comma-separated outputs produced in one OCR pass: {', '.join(OUTPUT_FORMATS)}")
+    parser.add_argument('--searchable-pdf', action='store_true',
+                        help=f"Also write an image + text PDF (<name>{SEARCHABLE_PDF_SUFFIX}) per document")
+    parser.add_argument('--preprocess',
+                        help=f"Comma-separated clean-up steps run before OCR, in order: {', '.join(PREPROCESSING_STEPS)}")
+    parser.add_argument('--text-height', type=int,
+                        help="Text height in pixels the 'downscale' step aims for")
+    parser.add_argument('--auto-language', action='store_true',
+                        help="OCR each page with the single language it is written in, "
+                             "falling back to all --languages on low confidence")
+    parser.add_argument('--language-fallback-confidence', type=float,
+                        help="Mean word confidence (0-100) below which --auto-language runs all "
+                             "--languages on a page whose language was not identified (default: 40)")
+    parser.add_argument('--dedup', action='store_true',
+                        help="Reuse the result of an earlier page for visually identical pages")
+    parser.add_argument('--dedup-threshold', type=int,
+                        help="Grey levels (0-255) any pixel of a page's 1/8 scale thumbnail may differ "
+                             "by from an earlier page for its result to be reused (default: 32)")
+    parser.add_argument('--dedup-index',
+                        help="SQLite file keeping page hashes and results across runs")
+    parser.add_argument('--adaptive-dpi', action='store_true',
+                        help="OCR at --low-dpi first and re-OCR low-confidence pages at --dpi")
+    parser.add_argument('--low-dpi', type=int, help="First pass resolution in adaptive mode")
+    parser.add_argument('--confidence-threshold', type=float,
+                        help="Mean word confidence (0-100) below which pages are re-OCR'd")
+    parser.add_argument('-j', '--jobs', type=int, default=2,
+                        help="Documents processed concurrently (default: 2)")
+    parser.add_argument('-w', '--workers', type=int,
+                        help="Pages OCR'd concurrently across all documents (default: CPU count)")
+    parser.add_argument('--pool', choices=POOL_TYPES, help="Worker pool type")
+    parser.add_argument('--engine', choices=OCR_ENGINES, help="OCR engine backend")
+    parser.add_argument('--streaming', action='store_true',
+                        help="Render in bounded page windows")
+    parser.add_argument('--max-pages-in-memory', type=int,
+                        help="Page window size in streaming mode")
+    parser.add_argument('--text-layer', action='store_true',
+                        help="Use the PDF text layer where present instead of OCR")
+    parser.add_argument('--skip-blank', action='store_true',
+                        help="Detect blank pages on thumbnails and skip their OCR")
+    parser.add_argument('--blank-threshold', type=float,
+                        help="Ink fraction (0-1) below which a page counts as blank")
+    parser.add_argument('--cache-dir', help="Directory of the OCR result cache")
+    parser.add_argument('--no-checkpoint', action='store_true',
+                        help="Do not checkpoint finished pages for resuming")
+    parser.add_argument('--index', type=Path,
+                        help="Add page texts to this SQLite full-text index (see expapyrus_search.py)")
+    parser.add_argument('--metrics-json', type=Path, help="Write run metrics as JSON to this file")
+    parser.add_argument('--metrics-prom', type=Path,
+                        help="Write run metrics in Prometheus text format to this file")
+    parser.add_argument('--tesseract-cmd', help="Path to the tesseract executable")
+    parser.add_argument('--tessdata-dir', help="Path to the tessdata directory")
+    parser.add_argument('-q', '--quiet', action='store_true', help="Only log warnings and errors")
+    return parser
+
+
+def config_overrides(args: argparse.Namespace) -> Dict[str, Any]:
+    """Translate command-line options into OCRConfig settings."""
+    overrides: Dict[str, Any] = {}
+    options = {
+        'tesseract_cmd': args.tesseract_cmd,
+        'tessdata_dir': args.tessdata_dir,
+        'languages': args.languages,
+        'dpi': args.dpi,
+        'output_formats': args.formats,
+        'preprocessing': args.preprocess,
+        'target_text_height': args.text_height,
+        'low_dpi': args.low_dpi,
+        'confidence_threshold': args.confidence_threshold,
+        'language_fallback_confidence': args.language_fallback_confidence,
+        'workers': args.workers,
+        'pool_type': args.pool,
+        'engine': args.engine,
+        'max_pages_in_memory': args.max_pages_in_memory,
+        'blank_threshold': args.blank_threshold,
+        'cache_dir': args.cache_dir,
+        'dedup_threshold': args.dedup_threshold,
+        'dedup_index': args.dedup_index,
+    }
+    for key, value in options.items():
+        if value is not None:
+            overrides[key] = value
+    if args.streaming:
+        overrides['streaming'] = True
+    if args.adaptive_dpi:
+        overrides['adaptive_dpi'] = True
+    if args.text_layer:
+        overrides['use_text_layer'] = True
+    if args.skip_blank:
+        overrides['detect_blank_pages'] = True
+    if args.auto_language:
+        overrides['auto_language'] = True
+    if args.dedup or args.dedup_index:
+        overrides['dedup'] = True
+    return overrides
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Run the batch CLI.
+
+    Returns:
+        int: Process exit status (0 when every document succeeded)
+    """
+    args = build_parser().parse_intermixed_args(argv)
+    logging.basicConfig(
+        level=logging.WARNING if args.quiet else logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+
+    pdf_paths = collect_pdfs(args.inputs, args.recursive)
+    if not pdf_paths:
+        logging.error("No PDF files found")
+        return 2
+
+    config = OCRConfig(config_overrides(args))
+    outputs = output_paths(pdf_paths, args.output_dir)
+    stats = BatchStats()
+
+    index = TextIndex(args.index) if args.index else None
+    start = time.perf_counter()
+    with PDFOCRExtractor(config) as extractor:
+        with ThreadPoolExecutor(max_workers=max(args.jobs, 1), thread_name_prefix='doc') as documents:
+            for pdf_path, output_path in zip(pdf_paths, outputs):
+                documents.submit(
+                    process_document, extractor, pdf_path, output_path, stats,
+                    checkpoint=not args.no_checkpoint,
+                    searchable_pdf=args.searchable_pdf,
+                    index=index
+                )
+        if args.metrics_json:
+            extractor.metrics.write_json(args.metrics_json)
+        if args.metrics_prom:
+            extractor.metrics.write_prometheus(args.metrics_prom)
+    elapsed = time.perf_counter() - start
+    if index is not None:
+        index.close()
+
+    print(stats.summary(elapsed))
+    return 1 if stats.failed_documents or stats.failed_pages else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
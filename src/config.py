@@ -5,29 +5,99 @@ import json
 import logging
 from typing import List, Dict, Any, Optional, Union
 
+from .discovery import TesseractInstall, discover_tesseract
+from .constants import (
+    DEFAULT_BLANK_THRESHOLD,
+    DEFAULT_CACHE_MAX_SIZE_MB,
+    DEFAULT_CONFIDENCE_THRESHOLD,
+    DEFAULT_DEDUP_THRESHOLD,
+    DEFAULT_LANGUAGE_FALLBACK_CONFIDENCE,
+    DEFAULT_LOW_DPI,
+    DEFAULT_MAX_PAGES_IN_MEMORY,
+    DEFAULT_MIN_TEXT_LAYER_CHARS,
+    DEFAULT_TARGET_TEXT_HEIGHT,
+    DEFAULT_TESSDATA_DIR,
+    DEFAULT_TESSERACT_CMD,
+    OCR_ENGINES,
+    OUTPUT_FORMATS,
+    POOL_TYPES,
+    PREPROCESSING_STEPS
+)
+
 class OCRConfig:
     """Configuration class for OCR settings."""
 
-    def __init__(self) -> None:
-        """Initialize OCR configuration with default values."""
-        self.tesseract_cmd = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
-        self.tessdata_dir = r"C:\Program Files\Tesseract-OCR\tessdata"
+    def __init__(self, overrides: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Initialize OCR configuration with default values.
+        
+        Args:
+            overrides: Settings applied on top of the configuration file
+        """
+        self.tesseract_cmd = DEFAULT_TESSERACT_CMD
+        self.tessdata_dir = DEFAULT_TESSDATA_DIR
+        self.tesseract_version: Optional[str] = None
+        self.available_languages: List[str] = []
         self.languages = ["eng"]
         self.dpi = 300
+        self.grayscale = False
+        self.output_formats = ["txt"]
+        self.preprocessing: List[str] = []
+        self.target_text_height = DEFAULT_TARGET_TEXT_HEIGHT
+        self.adaptive_dpi = False
+        self.low_dpi = DEFAULT_LOW_DPI
+        self.confidence_threshold = DEFAULT_CONFIDENCE_THRESHOLD
+        self.workers = os.cpu_count() or 1
+        self.pool_type = "thread"
+        self.engine = "auto"
+        self.streaming = False
+        self.max_pages_in_memory = DEFAULT_MAX_PAGES_IN_MEMORY
+        self.use_text_layer = False
+        self.detect_blank_pages = False
+        self.auto_language = False
+        self.language_fallback_confidence = DEFAULT_LANGUAGE_FALLBACK_CONFIDENCE
+        self.dedup = False
+        self.dedup_threshold = DEFAULT_DEDUP_THRESHOLD
+        self.dedup_index: Optional[str] = None
+        self.blank_threshold = DEFAULT_BLANK_THRESHOLD
+        self.min_text_layer_chars = DEFAULT_MIN_TEXT_LAYER_CHARS
+        self.cache_dir: Optional[str] = None
+        self.cache_max_size_mb = DEFAULT_CACHE_MAX_SIZE_MB
         self.config_file = "ocr_config.json"
         
-        self._verify_tesseract()
         self._load_config()
+        if overrides:
+            self._update_config(overrides)
+        self._verify_tesseract()
 
     def _verify_tesseract(self) -> None:
-        """Verify Tesseract installation and paths."""
-        if not os.path.exists(self.tesseract_cmd):
-            raise FileNotFoundError(f"Tesseract executable not found at: {self.tesseract_cmd}")
-        if not os.path.exists(self.tessdata_dir):
-            raise FileNotFoundError(f"Tessdata directory not found at: {self.tessdata_dir}")
-        logging.info(f"Tesseract command: {self.tesseract_cmd}")
+        """
+        Resolve the Tesseract installation and check the selected languages.
+
+        When the configured paths do not exist, Tesseract is looked up on
+        PATH and in the usual install locations. The probe result is cached
+        per installation, so this does not start Tesseract again.
+        """
+        install = self._tesseract_install()
+        self.tesseract_cmd = install.tesseract_cmd
+        self.tessdata_dir = install.tessdata_dir
+        self.tesseract_version = install.version
+        self.available_languages = list(install.languages)
+        self._check_languages(install)
+        logging.info(f"Tesseract command: {self.tesseract_cmd} (version {self.tesseract_version})")
         logging.info(f"Path to tessdata: {self.tessdata_dir}")
 
+    def _tesseract_install(self) -> TesseractInstall:
+        """Discover the installation for the currently configured paths."""
+        return discover_tesseract(self.tesseract_cmd, self.tessdata_dir)
+
+    def _check_languages(self, install: TesseractInstall) -> None:
+        """Raise if a selected language is not installed."""
+        for lang in self.languages:
+            if lang not in install.languages:
+                lang_file = os.path.join(install.tessdata_dir, f"{lang}.traineddata")
+                raise FileNotFoundError(f"Language file not found: {lang_file}")
+
     def _load_config(self) -> None:
         """Load configuration from file if exists."""
         if os.path.exists(self.config_file):
@@ -49,6 +119,52 @@ class OCRConfig:
             self.set_languages(config['languages'])
         if 'dpi' in config:
             self.dpi = int(config['dpi'])
+        if 'grayscale' in config:
+            self.grayscale = bool(config['grayscale'])
+        if 'output_formats' in config:
+            self.set_output_formats(config['output_formats'])
+        if 'preprocessing' in config:
+            self.set_preprocessing(config['preprocessing'])
+        if 'target_text_height' in config:
+            self.set_target_text_height(int(config['target_text_height']))
+        if 'adaptive_dpi' in config:
+            self.adaptive_dpi = bool(config['adaptive_dpi'])
+        if 'low_dpi' in config:
+            self.set_low_dpi(int(config['low_dpi']))
+        if 'confidence_threshold' in config:
+            self.set_confidence_threshold(float(config['confidence_threshold']))
+        if 'workers' in config:
+            self.set_workers(int(config['workers']))
+        if 'pool_type' in config:
+            self.set_pool_type(config['pool_type'])
+        if 'engine' in config:
+            self.set_engine(config['engine'])
+        if 'streaming' in config:
+            self.streaming = bool(config['streaming'])
+        if 'max_pages_in_memory' in config:
+            self.set_max_pages_in_memory(int(config['max_pages_in_memory']))
+        if 'use_text_layer' in config:
+            self.use_text_layer = bool(config['use_text_layer'])
+        if 'min_text_layer_chars' in config:
+            self.min_text_layer_chars = int(config['min_text_layer_chars'])
+        if 'detect_blank_pages' in config:
+            self.detect_blank_pages = bool(config['detect_blank_pages'])
+        if 'blank_threshold' in config:
+            self.set_blank_threshold(float(config['blank_threshold']))
+        if 'auto_language' in config:
+            self.auto_language = bool(config['auto_language'])
+        if 'language_fallback_confidence' in config:
+            self.set_language_fallback_confidence(float(config['language_fallback_confidence']))
+        if 'dedup' in config:
+            self.dedup = bool(config['dedup'])
+        if 'dedup_threshold' in config:
+            self.set_dedup_threshold(int(config['dedup_threshold']))
+        if 'dedup_index' in config:
+            self.dedup_index = config['dedup_index']
+        if 'cache_dir' in config:
+            self.cache_dir = config['cache_dir']
+        if 'cache_max_size_mb' in config:
+            self.set_cache_max_size(int(config['cache_max_size_mb']))
 
     def save_config(self) -> None:
         """Save current configuration to file."""
@@ -56,7 +172,30 @@ class OCRConfig:
             'tesseract_cmd': self.tesseract_cmd,
             'tessdata_dir': self.tessdata_dir,
             'languages': self.languages,
-            'dpi': self.dpi
+            'dpi': self.dpi,
+            'grayscale': self.grayscale,
+            'output_formats': self.output_formats,
+            'preprocessing': self.preprocessing,
+            'target_text_height': self.target_text_height,
+            'adaptive_dpi': self.adaptive_dpi,
+            'low_dpi': self.low_dpi,
+            'confidence_threshold': self.confidence_threshold,
+            'workers': self.workers,
+            'pool_type': self.pool_type,
+            'engine': self.engine,
+            'streaming': self.streaming,
+            'max_pages_in_memory': self.max_pages_in_memory,
+            'use_text_layer': self.use_text_layer,
+            'min_text_layer_chars': self.min_text_layer_chars,
+            'detect_blank_pages': self.detect_blank_pages,
+            'blank_threshold': self.blank_threshold,
+            'auto_language': self.auto_language,
+            'language_fallback_confidence': self.language_fallback_confidence,
+            'dedup': self.dedup,
+            'dedup_threshold': self.dedup_threshold,
+            'dedup_index': self.dedup_index,
+            'cache_dir': self.cache_dir,
+            'cache_max_size_mb': self.cache_max_size_mb
         }
         try:
             with open(self.config_file, 'w', encoding='utf-8') as f:
@@ -79,11 +218,7 @@ class OCRConfig:
         else:
             raise ValueError("Languages must be a string or list of language codes")
         
-        # Verify language files exist
-        for lang in self.languages:
-            lang_file = os.path.join(self.tessdata_dir, f"{lang}.traineddata")
-            if not os.path.exists(lang_file):
-                raise FileNotFoundError(f"Language file not found: {lang_file}")
+        self._check_languages(self._tesseract_install())
         
         logging.info(f"Languages set to: {self.languages}")
 
@@ -101,4 +236,168 @@ class OCRConfig:
         if not isinstance(dpi, int) or dpi <= 0:
             raise ValueError("DPI must be a positive integer")
         self.dpi = dpi
-        logging.info(f"DPI set to: {self.dpi}")
\ No newline at end of file
+        logging.info(f"DPI set to: {self.dpi}")
+
+    def set_output_formats(self, formats: Union[str, List[str]]) -> None:
+        """
+        Set the Tesseract outputs produced for every page.
+        
+        Args:
+            formats: String of formats separated by ',' or list of formats;
+                'txt' is always included
+        """
+        if isinstance(formats, str):
+            formats = [fmt.strip() for fmt in formats.split(',') if fmt.strip()]
+        unknown = [fmt for fmt in formats if fmt not in OUTPUT_FORMATS]
+        if unknown:
+            raise ValueError(f"Unsupported output formats: {', '.join(unknown)}")
+        self.output_formats = ['txt'] + [fmt for fmt in OUTPUT_FORMATS if fmt in formats and fmt != 'txt']
+        logging.info(f"Output formats set to: {self.output_formats}")
+
+    def set_preprocessing(self, steps: Union[str, List[str]]) -> None:
+        """
+        Set the image clean-up steps run on every page before OCR.
+        
+        Args:
+            steps: String of steps separated by ',' or list of steps, in the
+                order they should run; empty disables preprocessing
+        """
+        if isinstance(steps, str):
+            steps = [step.strip() for step in steps.split(',') if step.strip()]
+        unknown = [step for step in steps if step not in PREPROCESSING_STEPS]
+        if unknown:
+            raise ValueError(f"Unsupported preprocessing steps: {', '.join(unknown)}")
+        self.preprocessing = list(steps)
+        logging.info(f"Preprocessing set to: {self.preprocessing or 'none'}")
+
+    def set_target_text_height(self, height: int) -> None:
+        """
+        Set the text height in pixels the 'downscale' step shrinks pages to.
+        
+        Args:
+            height: Integer value in pixels (must be positive)
+        """
+        if not isinstance(height, int) or height <= 0:
+            raise ValueError("Target text height must be a positive integer")
+        self.target_text_height = height
+        logging.info(f"Target text height set to: {self.target_text_height}")
+
+    def set_low_dpi(self, dpi: int) -> None:
+        """
+        Set the DPI of the fast first pass in adaptive mode.
+        
+        Args:
+            dpi: Integer value for DPI (must be positive)
+        """
+        if not isinstance(dpi, int) or dpi <= 0:
+            raise ValueError("DPI must be a positive integer")
+        self.low_dpi = dpi
+        logging.info(f"Low DPI set to: {self.low_dpi}")
+
+    def set_confidence_threshold(self, threshold: float) -> None:
+        """
+        Set the mean word confidence below which a page is re-OCR'd.
+        
+        Args:
+            threshold: Value between 0 and 100
+        """
+        if not 0 <= threshold <= 100:
+            raise ValueError("Confidence threshold must be between 0 and 100")
+        self.confidence_threshold = float(threshold)
+        logging.info(f"Confidence threshold set to: {self.confidence_threshold}")
+
+    def set_language_fallback_confidence(self, threshold: float) -> None:
+        """
+        Set the mean word confidence below which auto language runs the full combo.
+        
+        Args:
+            threshold: Value between 0 and 100
+        """
+        if not 0 <= threshold <= 100:
+            raise ValueError("Language fallback confidence must be between 0 and 100")
+        self.language_fallback_confidence = float(threshold)
+        logging.info(f"Language fallback confidence set to: {self.language_fallback_confidence}")
+
+    def set_workers(self, workers: int) -> None:
+        """
+        Set the number of pages OCR'd concurrently.
+        
+        Args:
+            workers: Integer value for the pool size (1 disables parallelism)
+        """
+        if not isinstance(workers, int) or workers <= 0:
+            raise ValueError("Workers must be a positive integer")
+        self.workers = workers
+        logging.info(f"Workers set to: {self.workers}")
+
+    def set_pool_type(self, pool_type: str) -> None:
+        """
+        Set the kind of worker pool used for parallel OCR.
+        
+        Args:
+            pool_type: 'thread' or 'process'
+        """
+        if pool_type not in POOL_TYPES:
+            raise ValueError(f"Pool type must be one of: {', '.join(POOL_TYPES)}")
+        self.pool_type = pool_type
+        logging.info(f"Pool type set to: {self.pool_type}")
+
+    def set_engine(self, engine: str) -> None:
+        """
+        Set the OCR engine backend.
+        
+        Args:
+            engine: 'auto', 'subprocess' or 'tesserocr'
+        """
+        if engine not in OCR_ENGINES:
+            raise ValueError(f"Engine must be one of: {', '.join(OCR_ENGINES)}")
+        self.engine = engine
+        logging.info(f"OCR engine set to: {self.engine}")
+
+    def set_max_pages_in_memory(self, max_pages: int) -> None:
+        """
+        Set how many rendered pages streaming mode may hold at once.
+        
+        Args:
+            max_pages: Integer value for the page window (must be positive)
+        """
+        if not isinstance(max_pages, int) or max_pages <= 0:
+            raise ValueError("Max pages in memory must be a positive integer")
+        self.max_pages_in_memory = max_pages
+        logging.info(f"Max pages in memory set to: {self.max_pages_in_memory}")
+
+    def set_blank_threshold(self, threshold: float) -> None:
+        """
+        Set the ink fraction below which a page is treated as blank.
+        
+        Args:
+            threshold: Value between 0 and 1
+        """
+        if not 0 <= threshold <= 1:
+            raise ValueError("Blank threshold must be between 0 and 1")
+        self.blank_threshold = float(threshold)
+        logging.info(f"Blank threshold set to: {self.blank_threshold}")
+
+    def set_dedup_threshold(self, threshold: int) -> None:
+        """
+        Set how many grey levels any thumbnail pixel of two copies of a page may differ by.
+        
+        Args:
+            threshold: Value between 0 and 255, 0 for identical thumbnails only
+        """
+        if not 0 <= threshold <= 255:
+            raise ValueError("Dedup threshold must be between 0 and 255")
+        self.dedup_threshold = int(threshold)
+        logging.info(f"Dedup threshold set to: {self.dedup_threshold}")
+
+    def set_cache_max_size(self, size_mb: int) -> None:
+        """
+        Set the size limit of the OCR result cache.
+        
+        Args:
+            size_mb: Integer value in megabytes (must be positive)
+        """
+        if not isinstance(size_mb, int) or size_mb <= 0:
+            raise ValueError("Cache size must be a positive integer")
+        self.cache_max_size_mb = size_mb
+        logging.info(f"OCR cache size set to: {self.cache_max_size_mb} MB")
\ No newline at end of file
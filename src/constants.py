@@ -7,8 +7,48 @@ WINDOW_SIZE = "800x600"
 
 # OCR Configuration
 DEFAULT_DPI = 300
+DEFAULT_LOW_DPI = 150  # Adaptive mode: first pass resolution
+DEFAULT_CONFIDENCE_THRESHOLD = 80.0  # Adaptive mode: re-OCR pages below this
+DEFAULT_LANGUAGE_FALLBACK_CONFIDENCE = 40.0  # Auto language: full combo below this
+DEFAULT_TESSERACT_CMD = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+DEFAULT_TESSDATA_DIR = r"C:\Program Files\Tesseract-OCR\tessdata"
+# Where to look for Tesseract when the configured path does not exist
+TESSERACT_SEARCH_PATHS = (
+    DEFAULT_TESSERACT_CMD,
+    '/usr/bin/tesseract',
+    '/usr/local/bin/tesseract',
+    '/opt/homebrew/bin/tesseract',
+)
+# Image clean-up steps applied before OCR, see src/preprocessing.py
+PREPROCESSING_STEPS = ('grayscale', 'binarize', 'despeckle', 'deskew', 'crop', 'downscale')
+GEOMETRIC_PREPROCESSING_STEPS = ('deskew', 'crop')  # Mueven el texto respecto a la página
+DEFAULT_TARGET_TEXT_HEIGHT = 32  # Píxeles de altura de texto para 'downscale'
+BLANK_PAGE_MARKER = "[PÁGINA EN BLANCO]"  # Texto de las páginas en blanco
+DEFAULT_BLANK_THRESHOLD = 0.0005  # Fracción de tinta bajo la que una página está en blanco
 SUPPORTED_LANGUAGES = ['eng', 'spa', 'cat', 'eng+spa', 'eng+cat', 'spa+cat']
 OUTPUT_SUFFIX = "_extracted_text.txt"
+CHECKPOINT_SUFFIX = ".checkpoint.jsonl"
+OUTPUT_FORMATS = ('txt', 'hocr', 'tsv', 'pdf')  # Tesseract output configs
+PAGE_OUTPUTS_SUFFIX = "_pages"  # Directory for per-page hOCR/TSV/PDF outputs
+SEARCHABLE_PDF_SUFFIX = "_searchable.pdf"  # Image + invisible OCR text copy of the input
+
+# Parallel Processing
+POOL_TYPES = ('thread', 'process')
+
+# OCR Engines ('auto' uses tesserocr when installed, else the tesseract binary)
+OCR_ENGINES = ('auto', 'subprocess', 'tesserocr')
+
+# Streaming
+DEFAULT_MAX_PAGES_IN_MEMORY = 8
+
+# Text Layer (pages with at least this many native characters skip OCR)
+DEFAULT_MIN_TEXT_LAYER_CHARS = 50
+
+# Cancellation (seconds between checks while waiting for a page)
+CANCEL_POLL_INTERVAL = 0.1
+
+# OCR Result Cache
+DEFAULT_CACHE_MAX_SIZE_MB = 512
 
 # Default Settings
 DEFAULT_SETTINGS = {
@@ -41,6 +81,27 @@ THEME_CONFIG = {
     }
 }
 
+# Job Server (see src/server.py)
+DEFAULT_SERVER_PORT = 8765
+SERVER_DATA_DIR = 'server_data'  # Cola SQLite, PDFs subidos y resultados
+SERVER_POLL_INTERVAL = 1.0  # Segundos entre consultas de la cola sin trabajos
+
+# Page Deduplication (see src/dedup.py)
+DEFAULT_DEDUP_THRESHOLD = 32  # Niveles de gris (0-255) que puede diferir cada píxel de la miniatura
+DEDUP_MAX_PAGES = 4096  # Páginas recordadas por el índice de duplicados
+
+# Full-text Index (see src/index.py)
+SNIPPET_TOKENS = 12  # Palabras por fragmento en los resultados de búsqueda
+
+# Distributed Mode (see src/distributed.py)
+DEFAULT_PAGES_PER_TASK = 16
+DEFAULT_LEASE_SECONDS = 60.0  # Sin latido durante este tiempo, la tarea se reasigna
+MAX_TASK_ATTEMPTS = 3  # Leases caducados antes de dar la tarea por fallida
+DISTRIBUTED_POLL_INTERVAL = 1.0
+
+# GUI event queue polling (milliseconds)
+GUI_POLL_INTERVAL_MS = 100
+
 # File Handling
 MAX_RECENT_FILES = 10
 RECENT_FILES_FILE = 'recent_files.json'
@@ -0,0 +1,278 @@
+"""Perceptual-hash deduplication of rendered pages.
+
+Bundles often contain the same form, letterhead or attachment many times.
+Each rendered page is first reduced, in a few NumPy passes, to a grey
+thumbnail at 1/THUMBNAIL_FACTOR of its resolution, fine enough to keep
+the shape of every word. The thumbnail is then area-averaged to a
+HASH_SIZE x (HASH_SIZE + 1) grid and hashed: two bits per pair of
+neighbouring cells record whether the left one is clearly darker or
+clearly lighter than the right one, so both ends of a line of text set
+bits. Cells must differ by more than GRADIENT_TOLERANCE grey levels, so
+scanner noise on blank paper does not flip bits.
+
+The hash only finds candidates: pages whose hashes differ in at most
+CANDIDATE_DISTANCE bits. A candidate is reused only if no thumbnail pixel
+of the two pages differs by more than ``threshold`` grey levels, so a
+changed word, date or field always makes a page be recognized on its own
+while re-encoded or slightly noisy copies of the same render still match.
+
+``PageHashIndex`` keeps the hashes of the latest DEDUP_MAX_PAGES pages in
+memory; thumbnails and results live in SQLite, in a temporary file unless
+the index is kept across runs.
+"""
+
+import os
+import json
+import zlib
+import sqlite3
+import logging
+import tempfile
+import threading
+from concurrent.futures import Future
+from dataclasses import replace
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .constants import DEDUP_MAX_PAGES
+from .imaging import read_pnm
+
+HASH_SIZE = 32
+HASH_BITS = 2 * HASH_SIZE * HASH_SIZE  # Gradiente hacia cada lado
+THUMBNAIL_FACTOR = 8  # Píxeles por lado de cada píxel de la miniatura
+GRADIENT_TOLERANCE = 4.0  # Niveles de gris (0-255)
+CANDIDATE_DISTANCE = 32  # Bits distintos (de HASH_BITS) para comparar dos páginas
+MAX_CANDIDATES = 4  # Miniaturas comparadas como mucho por página
+
+# Bits a 1 de cada valor de byte, para la distancia de Hamming de hashes empaquetados
+POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint16)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS page_hashes (
+    id INTEGER PRIMARY KEY,
+    hash BLOB NOT NULL,
+    height INTEGER NOT NULL,
+    width INTEGER NOT NULL,
+    thumbnail BLOB NOT NULL,
+    settings TEXT NOT NULL,
+    source TEXT NOT NULL,
+    entry TEXT
+);
+"""
+
+
+class PageFingerprint(NamedTuple):
+    """Perceptual hash and thumbnail of a rendered page."""
+    hash: np.ndarray  # HASH_BITS bits empaquetados (uint8)
+    thumbnail: np.ndarray  # Gris, uint8
+
+
+def page_fingerprint(image_path: str) -> PageFingerprint:
+    """
+    Hash and thumbnail of a rendered page.
+
+    Args:
+        image_path: PGM/PPM page image
+
+    Returns:
+        PageFingerprint: Packed hash and grey thumbnail
+    """
+    raster = read_pnm(image_path)
+    image = np.frombuffer(raster.data, dtype=np.uint8).reshape(raster.height, raster.width, raster.channels)
+    height = max(raster.height // THUMBNAIL_FACTOR, 1)
+    width = max(raster.width // THUMBNAIL_FACTOR, 1)
+    if raster.height >= THUMBNAIL_FACTOR and raster.width >= THUMBNAIL_FACTOR:
+        # Bloques exactos: descarta como mucho THUMBNAIL_FACTOR - 1 píxeles del borde
+        blocks = image[:height * THUMBNAIL_FACTOR, :width * THUMBNAIL_FACTOR].reshape(
+            height, THUMBNAIL_FACTOR, width, THUMBNAIL_FACTOR, raster.channels
+        )
+        thumbnail = blocks.sum(axis=(1, 3, 4), dtype=np.uint32) / (THUMBNAIL_FACTOR ** 2 * raster.channels)
+    else:
+        thumbnail = _area_average(image, height, width)
+    cells = _area_average(thumbnail[:, :, np.newaxis], HASH_SIZE, HASH_SIZE + 1)
+    gradient = cells[:, :-1] - cells[:, 1:]
+    bits = np.concatenate([(gradient > GRADIENT_TOLERANCE).ravel(), (gradient < -GRADIENT_TOLERANCE).ravel()])
+    return PageFingerprint(np.packbits(bits), np.rint(thumbnail).astype(np.uint8))
+
+
+def _area_average(image: np.ndarray, height: int, width: int) -> np.ndarray:
+    """Average an (h, w, channels) image over a height x width grid of cells."""
+    rows = np.linspace(0, image.shape[0], height + 1).astype(int)[:-1]
+    columns = np.linspace(0, image.shape[1], width + 1).astype(int)[:-1]
+    sums = np.add.reduceat(np.add.reduceat(image, rows, axis=0, dtype=np.int64), columns, axis=1).sum(axis=2)
+    # En imágenes menores que la rejilla, reduceat devuelve el píxel inicial de las celdas vacías
+    heights = np.maximum(np.diff(np.append(rows, image.shape[0])), 1)
+    widths = np.maximum(np.diff(np.append(columns, image.shape[1])), 1)
+    return sums / (np.outer(heights, widths) * image.shape[2])
+
+
+def same_page(first: np.ndarray, second: np.ndarray, tolerance: int) -> bool:
+    """Whether two thumbnails show the same page, no pixel differing by more than ``tolerance``."""
+    if first.shape != second.shape:
+        return False
+    return int(np.abs(first.astype(np.int16) - second).max()) <= tolerance
+
+
+class PageHashIndex:
+    """
+    Fingerprints of processed pages and the results they produced.
+
+    Pages still being recognized are kept as futures, so a copy found in
+    the meantime waits for that result instead of running Tesseract again.
+    Only results for the same OCR ``settings`` match. Pages whose result
+    failed or was cancelled are dropped, and the oldest pages make room
+    once ``capacity`` is reached.
+
+    Args:
+        threshold: Maximum grey-level difference (0-255) of any thumbnail pixel
+        path: Optional SQLite file keeping the index across runs
+        capacity: Pages remembered
+    """
+
+    def __init__(self, threshold: int, path: Optional[Path] = None, capacity: int = DEDUP_MAX_PAGES) -> None:
+        self.threshold = threshold
+        self.capacity = capacity
+        self._hashes = np.zeros((capacity, HASH_BITS // 8), dtype=np.uint8)
+        self._rows = np.zeros(capacity, dtype=np.int64)  # Fila de SQLite de cada hueco, 0 = libre
+        self._entries: List[Optional[Tuple[str, str]]] = [None] * capacity  # settings, source
+        self._pending: Dict[int, Future] = {}  # Resultados aún en curso, por fila
+        self._next = 0
+        self._lock = threading.Lock()
+        self._temp_path: Optional[str] = None
+        if path is None:
+            fd, self._temp_path = tempfile.mkstemp(prefix='expapyrus-dedup-', suffix='.db')
+            os.close(fd)
+            path = self._temp_path
+        self._db: Optional[sqlite3.Connection] = None
+        self._open(Path(path))
+
+    def find(self, fingerprint: PageFingerprint, settings: str) -> Optional[Tuple[str, Future]]:
+        """
+        Look up an earlier copy of a page processed with the same settings.
+
+        Returns:
+            Optional[Tuple[str, Future]]: Source page (``<pdf>#<page>``) and
+            its future PageResult, None when no page is close enough
+        """
+        with self._lock:
+            if self._db is None:
+                return None
+            # Distancia de Hamming contra todo el índice de una vez
+            distances = POPCOUNT[self._hashes ^ fingerprint.hash].sum(axis=1)
+            distances[self._rows == 0] = HASH_BITS + 1
+            compared = 0
+            for slot in np.argsort(distances, kind='stable'):
+                if distances[slot] > CANDIDATE_DISTANCE or compared >= MAX_CANDIDATES:
+                    return None
+                entry_settings, source = self._entries[slot]
+                if entry_settings != settings:
+                    continue
+                compared += 1
+                row = int(self._rows[slot])
+                height, width, thumbnail, entry = self._db.execute(
+                    'SELECT height, width, thumbnail, entry FROM page_hashes WHERE id = ?', (row,)
+                ).fetchone()
+                stored = np.frombuffer(zlib.decompress(thumbnail), dtype=np.uint8).reshape(height, width)
+                if not same_page(fingerprint.thumbnail, stored, self.threshold):
+                    continue
+                if entry is None:
+                    return source, self._pending[row]
+                return source, _completed(json.loads(entry))
+        return None
+
+    def add(self, fingerprint: PageFingerprint, settings: str, source: str, result: Future) -> None:
+        """Register a page whose result ``result`` will resolve to; kept once it succeeds."""
+        thumbnail = zlib.compress(fingerprint.thumbnail.tobytes(), 1)
+        with self._lock:
+            if self._db is None:
+                return
+            slot = self._next
+            self._next = (slot + 1) % self.capacity
+            self._evict(slot)
+            with self._db:
+                row = self._db.execute(
+                    'INSERT INTO page_hashes (hash, height, width, thumbnail, settings, source) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (fingerprint.hash.tobytes(), *fingerprint.thumbnail.shape, thumbnail, settings, source)
+                ).lastrowid
+            self._hashes[slot] = fingerprint.hash
+            self._rows[slot] = row
+            self._entries[slot] = (settings, source)
+            self._pending[row] = result
+        result.add_done_callback(lambda done: self._finish(row, done))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+            if self._temp_path is not None:
+                os.remove(self._temp_path)
+                self._temp_path = None
+
+    def _open(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        # Es una caché: un corte de luz como mucho obliga a repetir el OCR de las últimas páginas
+        self._db.execute('PRAGMA synchronous=OFF')
+        with self._db:
+            self._db.executescript(SCHEMA)
+            # Páginas que otra ejecución no llegó a terminar
+            self._db.execute('DELETE FROM page_hashes WHERE entry IS NULL')
+            rows = self._db.execute(
+                'SELECT id, hash, settings, source FROM page_hashes ORDER BY id DESC LIMIT ?', (self.capacity,)
+            ).fetchall()[::-1]
+            if rows:
+                self._db.execute('DELETE FROM page_hashes WHERE id < ?', (rows[0][0],))
+        for slot, (row, hash_bytes, settings, source) in enumerate(rows):
+            self._hashes[slot] = np.frombuffer(hash_bytes, dtype=np.uint8)
+            self._rows[slot] = row
+            self._entries[slot] = (settings, source)
+        self._next = len(rows) % self.capacity
+        if self._temp_path is None:
+            logging.info(f"Loaded {len(rows)} page hashes from {path}")
+
+    def _finish(self, row: int, done: Future) -> None:
+        """Keep a finished page's result, or forget the page if it failed."""
+        from .ocr_processor import page_entry
+
+        failed = done.cancelled() or done.exception() is not None or done.result().error is not None
+        entry = None
+        if not failed:
+            # Copia: quien recoge la página sigue añadiendo tiempos al original
+            entry = page_entry(replace(done.result(), timings={}, temp_bytes=0, pdf_page=None))
+        with self._lock:
+            self._pending.pop(row, None)
+            if self._db is None:
+                return
+            with self._db:
+                if failed:
+                    self._db.execute('DELETE FROM page_hashes WHERE id = ?', (row,))
+                else:
+                    self._db.execute('UPDATE page_hashes SET entry = ? WHERE id = ?', (json.dumps(entry), row))
+            if failed:
+                for slot in np.flatnonzero(self._rows == row):
+                    self._rows[slot] = 0
+                    self._entries[slot] = None
+
+    def _evict(self, slot: int) -> None:
+        """Free a slot for a new page; caller holds the lock."""
+        row = int(self._rows[slot])
+        if not row:
+            return
+        with self._db:
+            self._db.execute('DELETE FROM page_hashes WHERE id = ?', (row,))
+        self._pending.pop(row, None)
+        self._rows[slot] = 0
+        self._entries[slot] = None
+
+
+def _completed(entry: Dict) -> Future:
+    """A future already holding the PageResult of a stored entry."""
+    from .ocr_processor import page_result
+
+    result: Future = Future()
+    result.set_result(page_result(entry))
+    return result
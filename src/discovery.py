@@ -0,0 +1,184 @@
+"""Discovery of the Tesseract installation and its installed languages.
+
+Probing Tesseract means running ``tesseract --version`` and
+``tesseract --list-langs``. The result is kept in memory and in a small
+JSON cache in the user's cache directory, keyed by the binary's path,
+size and mtime and by the configured tessdata directory. Each entry also
+records the modification time of the tessdata directory Tesseract
+actually uses, checked on every lookup. Later configs and new processes
+then reuse it without starting Tesseract, while installing a language or
+upgrading Tesseract triggers a new probe.
+"""
+
+import os
+import re
+import json
+import shutil
+import logging
+import threading
+import subprocess
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .constants import DEFAULT_TESSDATA_DIR, TESSERACT_SEARCH_PATHS
+
+CACHE_FILE_NAME = 'tesseract.json'
+
+
+class TesseractInstall(NamedTuple):
+    """A probed Tesseract installation."""
+    tesseract_cmd: str
+    tessdata_dir: str
+    version: str
+    languages: Tuple[str, ...]
+
+
+_installs: Dict[str, Tuple[TesseractInstall, Optional[int]]] = {}  # Instalación, mtime de tessdata
+_lock = threading.Lock()
+
+
+def cache_path() -> Path:
+    """Location of the on-disk discovery cache."""
+    base = os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache'
+    return Path(base) / 'expapyrus' / CACHE_FILE_NAME
+
+
+def find_tesseract(preferred: Optional[str] = None) -> Optional[str]:
+    """
+    Locate the Tesseract executable.
+
+    Args:
+        preferred: Configured path or command name, tried first
+
+    Returns:
+        Optional[str]: Absolute path of the executable, or None if not found
+    """
+    candidates: List[str] = []
+    if preferred:
+        candidates.append(preferred)
+    candidates.append('tesseract')
+    candidates.extend(TESSERACT_SEARCH_PATHS)
+    for candidate in candidates:
+        if os.path.isfile(candidate) and os.access(candidate, os.X_OK):
+            return os.path.abspath(candidate)
+        found = shutil.which(candidate)
+        if found:
+            return found
+    return None
+
+
+def discover_tesseract(tesseract_cmd: Optional[str] = None,
+                       tessdata_dir: Optional[str] = None) -> TesseractInstall:
+    """
+    Find Tesseract and describe its version and installed languages.
+
+    Args:
+        tesseract_cmd: Preferred executable; PATH and the usual install
+            locations are searched when it does not exist
+        tessdata_dir: Preferred tessdata directory; Tesseract's own default
+            is used when it does not exist
+
+    Returns:
+        TesseractInstall: The installation, from cache when unchanged
+
+    Raises:
+        FileNotFoundError: If no Tesseract executable can be found
+        RuntimeError: If Tesseract cannot be run
+    """
+    executable = find_tesseract(tesseract_cmd)
+    if executable is None:
+        raise FileNotFoundError(f"Tesseract executable not found at: {tesseract_cmd}")
+    if tessdata_dir and not os.path.isdir(tessdata_dir):
+        # La ruta por defecto es la de Windows: en otros sistemas no es un error de configuración
+        level = logging.DEBUG if tessdata_dir == DEFAULT_TESSDATA_DIR else logging.WARNING
+        logging.log(level, f"Tessdata directory not found at: {tessdata_dir}, using Tesseract's default")
+        tessdata_dir = None
+
+    key = _cache_key(executable, tessdata_dir)
+    with _lock:
+        if key in _installs:
+            install, mtime = _installs[key]
+            if _tessdata_mtime(install.tessdata_dir) == mtime:
+                return install
+
+        disk_cache = _read_cache()
+        entry = disk_cache.get(key)
+        if entry is not None and _tessdata_mtime(entry['tessdata_dir']) == entry.get('tessdata_mtime'):
+            install = TesseractInstall(**{
+                name: entry[name] for name in TesseractInstall._fields
+            })._replace(languages=tuple(entry['languages']))
+        else:
+            install = _probe(executable, tessdata_dir)
+            disk_cache[key] = {**install._asdict(), 'tessdata_mtime': _tessdata_mtime(install.tessdata_dir)}
+            _write_cache(disk_cache)
+        _installs[key] = (install, _tessdata_mtime(install.tessdata_dir))
+        return install
+
+
+def _cache_key(executable: str, tessdata_dir: Optional[str]) -> str:
+    """Identify an installation by its binary's path, size and modification time."""
+    stat = os.stat(executable)
+    parts = [os.path.realpath(executable), str(stat.st_size), str(stat.st_mtime_ns)]
+    if tessdata_dir:
+        parts.append(os.path.realpath(tessdata_dir))
+    return '|'.join(parts)
+
+
+def _tessdata_mtime(tessdata_dir: str) -> Optional[int]:
+    """Modification time of a tessdata directory; it changes when a model is added or removed."""
+    try:
+        return os.stat(tessdata_dir).st_mtime_ns if tessdata_dir else None
+    except OSError:
+        return None
+
+
+def _probe(executable: str, tessdata_dir: Optional[str]) -> TesseractInstall:
+    """Ask Tesseract for its version, tessdata directory and languages."""
+    version_output = _run([executable, '--version'])
+    match = re.search(r'tesseract\s+v?(\S+)', version_output, re.IGNORECASE)
+    version = match.group(1) if match else version_output.split('\n', 1)[0].strip()
+
+    command = [executable, '--list-langs']
+    if tessdata_dir:
+        command[1:1] = ['--tessdata-dir', tessdata_dir]
+    lines = _run(command).splitlines()
+    # Primera línea: List of available languages in "/ruta/tessdata/" (N):
+    match = re.search(r'"(.*)"', lines[0]) if lines else None
+    if not tessdata_dir:
+        tessdata_dir = match.group(1).rstrip('/\\') if match else ''
+    languages = tuple(sorted(line.strip() for line in lines[1:] if line.strip()))
+
+    logging.info(f"Found Tesseract {version} at {executable} ({len(languages)} languages)")
+    return TesseractInstall(executable, tessdata_dir, version, languages)
+
+
+def _run(command: List[str]) -> str:
+    try:
+        result = subprocess.run(command, capture_output=True, text=True, check=False)
+    except OSError as e:
+        raise RuntimeError(f"Could not run Tesseract: {e}") from e
+    if result.returncode != 0:
+        raise RuntimeError(f"Tesseract error: {result.stderr}")
+    # Versiones antiguas escriben --version en stderr
+    return result.stdout or result.stderr
+
+
+def _read_cache() -> Dict[str, Dict]:
+    try:
+        with open(cache_path(), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_cache(entries: Dict[str, Dict]) -> None:
+    path = cache_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(entries, f, indent=2)
+        os.replace(temp_path, path)
+    except OSError as e:
+        # Sin caché en disco se vuelve a sondear en el siguiente proceso
+        logging.warning(f"Could not write Tesseract discovery cache {path}: {e}")
@@ -0,0 +1,419 @@
+"""Coordinator/worker mode sharding documents across machines.
+
+Coordinator and workers share nothing but a directory, e.g. an NFS or SMB
+mount visible to every node:
+
+- ``documents/<doc>.json``: a submitted document and its page ranges
+- ``tasks/<task>.json``: page ranges waiting for a worker
+- ``leases/<task>.json``: ranges being processed. A worker claims a task
+  by renaming it here, an atomic operation on one file system, and keeps
+  the lease alive by touching the file. A lease whose modification time
+  is older than the lease timeout belongs to a dead worker and is moved
+  back to ``tasks/``; a task that keeps failing this way is given up
+  after ``MAX_TASK_ATTEMPTS``. Node clocks must be kept in sync (NTP)
+  for lease ages to be meaningful.
+- ``results/<task>.json``: finished pages of a range, in ``page_entry`` form
+
+The coordinator merges the results of each document back in page order.
+PDF paths must be readable by the workers under the same path, or be
+copied into the queue directory on submission. Every worker uses its own
+OCRConfig, so nodes should share the same settings.
+"""
+
+import os
+import sys
+import json
+import time
+import uuid
+import shutil
+import socket
+import logging
+import argparse
+import threading
+from concurrent.futures import CancelledError
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from .config import OCRConfig
+from .ocr_processor import PDFOCRExtractor, PageResult, page_entry, page_result
+from .output import TextOutputWriter
+from .constants import (
+    APP_TITLE,
+    APP_VERSION,
+    DEFAULT_LEASE_SECONDS,
+    DEFAULT_PAGES_PER_TASK,
+    DISTRIBUTED_POLL_INTERVAL,
+    MAX_TASK_ATTEMPTS,
+    OUTPUT_SUFFIX
+)
+
+QUEUE_DIRECTORIES = ('documents', 'tasks', 'leases', 'results')
+
+
+def _write_json(path: Path, value: Any) -> None:
+    """Write JSON atomically: readers on other nodes never see a partial file."""
+    temp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(value, f)
+    os.replace(temp_path, path)
+
+
+def _read_json(path: Path) -> Optional[Any]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+class TaskQueue:
+    """
+    Lease-based page-range queue in a shared directory.
+
+    Args:
+        root: Queue directory shared by the coordinator and every worker
+        lease_seconds: Seconds without a heartbeat after which a lease expires
+    """
+
+    def __init__(self, root: Path, lease_seconds: float = DEFAULT_LEASE_SECONDS) -> None:
+        self.root = Path(root)
+        self.lease_seconds = lease_seconds
+        for name in QUEUE_DIRECTORIES:
+            (self.root / name).mkdir(parents=True, exist_ok=True)
+
+    def _path(self, directory: str, task_id: str) -> Path:
+        return self.root / directory / f"{task_id}.json"
+
+    def add_document(self, doc_id: str, pdf_path: Path, page_count: int, pages_per_task: int) -> List[str]:
+        """Split a document into page-range tasks and queue them."""
+        tasks = []
+        for first_page in range(1, page_count + 1, pages_per_task):
+            task = {
+                'id': f"{doc_id}-{first_page:07d}",
+                'document': doc_id,
+                'pdf_path': str(pdf_path),
+                'first_page': first_page,
+                'last_page': min(first_page + pages_per_task - 1, page_count),
+                'attempts': 0,
+            }
+            _write_json(self._path('tasks', task['id']), task)
+            tasks.append(task)
+        _write_json(self._path('documents', doc_id), {
+            'id': doc_id, 'pdf_path': str(pdf_path), 'pages': page_count, 'tasks': tasks
+        })
+        return [task['id'] for task in tasks]
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """Lease the oldest available task, None when there is none."""
+        for entry in sorted(os.listdir(self.root / 'tasks')):
+            if not entry.endswith('.json') or entry.startswith('.'):
+                continue
+            task_path = self.root / 'tasks' / entry
+            lease_path = self.root / 'leases' / entry
+            try:
+                # El lease nace fresco: rename conserva la fecha de la tarea
+                os.utime(task_path)
+                os.rename(task_path, lease_path)
+            except FileNotFoundError:
+                # Otro worker se la ha llevado antes
+                continue
+            return _read_json(lease_path)
+        return None
+
+    def heartbeat(self, task_id: str) -> bool:
+        """Renew a lease; False if it expired and was handed to someone else."""
+        try:
+            os.utime(self._path('leases', task_id))
+            return True
+        except FileNotFoundError:
+            return False
+
+    def complete(self, task_id: str, result: Dict[str, Any]) -> None:
+        """Publish a task's result and release its lease."""
+        _write_json(self._path('results', task_id), result)
+        try:
+            os.remove(self._path('leases', task_id))
+        except FileNotFoundError:
+            pass
+
+    def result(self, task_id: str) -> Optional[Dict[str, Any]]:
+        return _read_json(self._path('results', task_id))
+
+    def document(self, doc_id: str) -> Optional[Dict[str, Any]]:
+        return _read_json(self._path('documents', doc_id))
+
+    def reclaim_expired(self) -> int:
+        """
+        Queue again the tasks whose lease expired.
+
+        Returns:
+            int: Number of tasks reassigned or given up
+        """
+        reclaimed = 0
+        deadline = time.time() - self.lease_seconds
+        for entry in os.listdir(self.root / 'leases'):
+            lease_path = self.root / 'leases' / entry
+            if not entry.endswith('.json') or entry.startswith('.'):
+                continue
+            try:
+                if os.stat(lease_path).st_mtime >= deadline:
+                    continue
+                # Renombrar primero: solo un proceso puede reclamar el mismo lease
+                reclaim_path = lease_path.with_name(f".{entry}.{uuid.uuid4().hex}.reclaim")
+                os.rename(lease_path, reclaim_path)
+            except FileNotFoundError:
+                continue
+            task = _read_json(reclaim_path)
+            os.remove(reclaim_path)
+            if task is None or os.path.exists(self._path('results', task['id'])):
+                continue
+            task['attempts'] += 1
+            reclaimed += 1
+            if task['attempts'] >= MAX_TASK_ATTEMPTS:
+                logging.error(f"Task {task['id']} lost {task['attempts']} workers, giving up")
+                _write_json(self._path('results', task['id']), {
+                    'id': task['id'], 'error': "Lease expired too many times", 'pages': []
+                })
+            else:
+                logging.warning(f"Lease of task {task['id']} expired, reassigning")
+                _write_json(self._path('tasks', task['id']), task)
+        return reclaimed
+
+    def remove_document(self, doc_id: str) -> None:
+        """Delete a merged document's bookkeeping and results."""
+        document = self.document(doc_id)
+        for task in (document or {}).get('tasks', []):
+            for directory in ('tasks', 'leases', 'results'):
+                try:
+                    os.remove(self._path(directory, task['id']))
+                except FileNotFoundError:
+                    pass
+        try:
+            os.remove(self._path('documents', doc_id))
+        except FileNotFoundError:
+            pass
+
+
+class Coordinator:
+    """
+    Submits documents to a TaskQueue and merges their results in page order.
+
+    Args:
+        queue: Shared task queue
+        pages_per_task: Pages per task
+        copy_inputs: Copy submitted PDFs into the queue directory, for
+            workers that cannot read the original paths
+    """
+
+    def __init__(self, queue: TaskQueue, pages_per_task: int = DEFAULT_PAGES_PER_TASK,
+                 copy_inputs: bool = False) -> None:
+        self.queue = queue
+        self.pages_per_task = max(pages_per_task, 1)
+        self.copy_inputs = copy_inputs
+
+    def submit(self, pdf_path: Path) -> str:
+        """Queue a document and return its id."""
+        from pdf2image import pdfinfo_from_path
+
+        doc_id = uuid.uuid4().hex
+        pdf_path = Path(pdf_path).resolve()
+        page_count = int(pdfinfo_from_path(pdf_path)['Pages'])
+        if self.copy_inputs:
+            copy_path = self.queue.root / 'documents' / f"{doc_id}.pdf"
+            shutil.copyfile(pdf_path, copy_path)
+            pdf_path = copy_path
+        task_ids = self.queue.add_document(doc_id, pdf_path, page_count, self.pages_per_task)
+        logging.info(f"Queued {pdf_path}: {page_count} pages in {len(task_ids)} tasks")
+        return doc_id
+
+    def iter_pages(self, doc_id: str) -> Iterator[PageResult]:
+        """
+        Yield a document's pages in order as their tasks finish.
+
+        Expired leases are reassigned while waiting. Pages of a task that
+        was given up are yielded as failed pages.
+        """
+        document = self.queue.document(doc_id)
+        if document is None:
+            raise FileNotFoundError(f"Unknown document: {doc_id}")
+        for task in document['tasks']:
+            result = self.queue.result(task['id'])
+            while result is None:
+                self.queue.reclaim_expired()
+                time.sleep(DISTRIBUTED_POLL_INTERVAL)
+                result = self.queue.result(task['id'])
+            pages = {entry['page_number']: page_result(entry) for entry in result['pages']}
+            for page_number in range(task['first_page'], task['last_page'] + 1):
+                yield pages.get(page_number) or PageResult(
+                    page_number, error=result.get('error') or "Page missing from worker result"
+                )
+
+    def process(self, pdf_paths: Sequence[Path], output_dir: Optional[Path] = None) -> int:
+        """
+        Submit every PDF, then write each merged document to its text output.
+
+        Returns:
+            int: Number of failed pages
+        """
+        submitted = [(Path(pdf_path), self.submit(pdf_path)) for pdf_path in pdf_paths]
+        failed_pages = 0
+        for pdf_path, doc_id in submitted:
+            output_path = (output_dir or pdf_path.parent) / f"{pdf_path.stem}{OUTPUT_SUFFIX}"
+            with TextOutputWriter(output_path) as writer:
+                for result in self.iter_pages(doc_id):
+                    failed_pages += result.error is not None
+                    writer.write(result)
+            self.queue.remove_document(doc_id)
+            if self.copy_inputs:
+                os.remove(self.queue.root / 'documents' / f"{doc_id}.pdf")
+            logging.info(f"Saved {output_path}")
+        return failed_pages
+
+
+class Worker:
+    """
+    Claims tasks from a TaskQueue and processes them with a local extractor.
+
+    Args:
+        queue: Shared task queue
+        extractor: Extractor used for every task
+        name: Worker name for logs, defaults to host and process id
+    """
+
+    def __init__(self, queue: TaskQueue, extractor: PDFOCRExtractor, name: Optional[str] = None) -> None:
+        self.queue = queue
+        self.extractor = extractor
+        self.name = name or f"{socket.gethostname()}-{os.getpid()}"
+        self._stopping = threading.Event()
+
+    def run(self, exit_when_idle: bool = False) -> int:
+        """
+        Process tasks until stopped.
+
+        Args:
+            exit_when_idle: Return once no task is available instead of waiting
+
+        Returns:
+            int: Number of tasks completed
+        """
+        completed = 0
+        while not self._stopping.is_set():
+            self.queue.reclaim_expired()
+            task = self.queue.claim()
+            if task is None:
+                if exit_when_idle:
+                    break
+                self._stopping.wait(DISTRIBUTED_POLL_INTERVAL)
+                continue
+            self.process(task)
+            completed += 1
+        return completed
+
+    def stop(self) -> None:
+        self._stopping.set()
+
+    def process(self, task: Dict[str, Any]) -> None:
+        """Run one leased task, renewing its lease until it is done."""
+        task_id = task['id']
+        logging.info(f"{self.name}: pages {task['first_page']}-{task['last_page']} of {task['pdf_path']}")
+        done = threading.Event()
+        lost = threading.Event()
+
+        def heartbeat() -> None:
+            while not done.wait(self.queue.lease_seconds / 3):
+                if not self.queue.heartbeat(task_id):
+                    lost.set()
+                    return
+
+        thread = threading.Thread(target=heartbeat, name=f'lease-{task_id}', daemon=True)
+        thread.start()
+        try:
+            pages = [
+                page_entry(result) for result in self.extractor.iter_pages(
+                    Path(task['pdf_path']), ordered=True,
+                    page_range=(task['first_page'], task['last_page']),
+                    cancel=lost
+                )
+            ]
+            result = {'id': task_id, 'worker': self.name, 'pages': pages}
+        except CancelledError:
+            result = None
+        except Exception as e:
+            # Un fallo del documento entero no se arregla reintentando en otro nodo
+            logging.error(f"{self.name}: task {task_id} failed: {e}")
+            result = {'id': task_id, 'worker': self.name, 'error': str(e), 'pages': []}
+        finally:
+            done.set()
+            thread.join()
+        if lost.is_set():
+            logging.warning(f"{self.name}: lease of task {task_id} was lost, dropping its result")
+            return
+        self.queue.complete(task_id, result)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command-line argument parser for both roles."""
+    parser = argparse.ArgumentParser(
+        prog='expapyrus-distributed',
+        description=f"{APP_TITLE} {APP_VERSION} - OCR sharded over a shared directory"
+    )
+    parser.add_argument('-q', '--quiet', action='store_true', help="Only log warnings and errors")
+    roles = parser.add_subparsers(dest='role', required=True)
+
+    coordinator = roles.add_parser('coordinator', help="Queue PDFs and merge their results")
+    coordinator.add_argument('queue_dir', type=Path, help="Shared queue directory")
+    coordinator.add_argument('inputs', nargs='+', type=Path, help="PDF files")
+    coordinator.add_argument('-o', '--output-dir', type=Path,
+                             help="Directory for output files (default: next to each PDF)")
+    coordinator.add_argument('--pages-per-task', type=int, default=DEFAULT_PAGES_PER_TASK,
+                             help=f"Pages per task (default: {DEFAULT_PAGES_PER_TASK})")
+    coordinator.add_argument('--copy-inputs', action='store_true',
+                             help="Copy PDFs into the queue directory for workers to read")
+    coordinator.add_argument('--lease-seconds', type=float, default=DEFAULT_LEASE_SECONDS,
+                             help=f"Lease timeout (default: {DEFAULT_LEASE_SECONDS})")
+
+    worker = roles.add_parser('worker', help="Process tasks from the queue")
+    worker.add_argument('queue_dir', type=Path, help="Shared queue directory")
+    worker.add_argument('--exit-when-idle', action='store_true',
+                        help="Exit when the queue is empty instead of waiting")
+    worker.add_argument('--lease-seconds', type=float, default=DEFAULT_LEASE_SECONDS,
+                        help=f"Lease timeout (default: {DEFAULT_LEASE_SECONDS})")
+    worker.add_argument('-w', '--workers', type=int, help="Pages OCR'd concurrently on this node")
+    worker.add_argument('-l', '--languages', help="Tesseract languages, e.g. eng+spa")
+    worker.add_argument('--tesseract-cmd', help="Path to the tesseract executable")
+    worker.add_argument('--tessdata-dir', help="Path to the tessdata directory")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run a coordinator or a worker."""
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(
+        level=logging.WARNING if args.quiet else logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    queue = TaskQueue(args.queue_dir, args.lease_seconds)
+    if args.role == 'coordinator':
+        coordinator = Coordinator(queue, args.pages_per_task, args.copy_inputs)
+        return 1 if coordinator.process(args.inputs, args.output_dir) else 0
+
+    overrides = {
+        'workers': args.workers,
+        'languages': args.languages,
+        'tesseract_cmd': args.tesseract_cmd,
+        'tessdata_dir': args.tessdata_dir,
+    }
+    config = OCRConfig({key: value for key, value in overrides.items() if value is not None})
+    with PDFOCRExtractor(config) as extractor:
+        worker = Worker(queue, extractor)
+        try:
+            completed = worker.run(args.exit_when_idle)
+        except KeyboardInterrupt:
+            # El lease caduca y otro worker retoma la tarea
+            return 0
+    logging.info(f"{worker.name}: {completed} tasks completed")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,271 @@
+"""OCR engine backends used by PDFOCRExtractor."""
+
+import os
+import logging
+import subprocess
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+# Tesseract output configs whose results are bytes rather than text
+BINARY_OUTPUTS = ('pdf',)
+
+
+class EngineSpec(NamedTuple):
+    """Picklable description of an engine, used to find or create it inside a worker."""
+    backend: str
+    tesseract_cmd: str
+    tessdata_dir: str
+    languages: str
+    single_thread: bool = False
+
+
+def run_tesseract(command: List[str], env: Optional[Dict[str, str]] = None) -> str:
+    """
+    Run a Tesseract command and return the recognized text.
+
+    Args:
+        command: Full Tesseract command line writing to stdout
+        env: Environment for the child process (inherits ours if None)
+
+    Returns:
+        str: Text printed by Tesseract
+
+    Raises:
+        RuntimeError: If Tesseract exits with a non-zero status
+    """
+    logging.debug(f"Running Tesseract command: {' '.join(command)}")
+
+    result = subprocess.run(
+        command,
+        capture_output=True,
+        text=True,
+        env=env,
+        check=False  # Gestionamos el error nosotros
+    )
+
+    if result.returncode != 0:
+        raise RuntimeError(f"Tesseract error: {result.stderr}")
+    return result.stdout
+
+
+def read_outputs(output_base: str, outputs: Sequence[str]) -> Dict[str, Any]:
+    """
+    Read and delete the files Tesseract wrote for each output config.
+
+    Args:
+        output_base: Output base passed to Tesseract
+        outputs: Output configs that were requested
+
+    Returns:
+        Dict[str, Any]: Text (or bytes for binary formats) keyed by config
+    """
+    results: Dict[str, Any] = {}
+    for output in outputs:
+        output_path = f"{output_base}.{output}"
+        if output in BINARY_OUTPUTS:
+            with open(output_path, 'rb') as f:
+                results[output] = f.read()
+        else:
+            with open(output_path, 'r', encoding='utf-8') as f:
+                results[output] = f.read()
+        os.remove(output_path)
+    return results
+
+
+def mean_confidence(tsv: str) -> float:
+    """
+    Average the per-word confidences of a Tesseract TSV result.
+
+    Args:
+        tsv: Output of Tesseract's ``tsv`` config
+
+    Returns:
+        float: Mean word confidence (0-100), 0 when no words were found
+    """
+    confidences = []
+    for line in tsv.splitlines()[1:]:
+        columns = line.split('\t')
+        if len(columns) < 12 or columns[0] != '5' or not columns[11].strip():
+            continue
+        try:
+            confidence = float(columns[10])
+        except ValueError:
+            continue
+        if confidence >= 0:
+            confidences.append(confidence)
+    return sum(confidences) / len(confidences) if confidences else 0.0
+
+
+class OCREngine:
+    """Base class for OCR backends."""
+
+    name = ''
+
+    def __init__(self, spec: EngineSpec) -> None:
+        self.spec = spec
+
+    def recognize(self, image_path: str, outputs: Sequence[str] = ('txt',)) -> Dict[str, Any]:
+        """
+        Recognize one page image, producing every requested output in one pass.
+
+        Args:
+            image_path: Path of an image file Tesseract can read
+            outputs: Tesseract output configs: 'txt', 'tsv', 'hocr', 'pdf'
+
+        Returns:
+            Dict[str, Any]: Output contents keyed by config name (bytes for
+            binary formats such as 'pdf', text otherwise)
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release any resources held by the engine."""
+
+
+class SubprocessEngine(OCREngine):
+    """Runs a fresh ``tesseract`` process per page."""
+
+    name = 'subprocess'
+
+    def __init__(self, spec: EngineSpec) -> None:
+        super().__init__(spec)
+        self.env = None
+        if spec.single_thread:
+            # Varias páginas en paralelo: un hilo OpenMP por Tesseract
+            self.env = os.environ.copy()
+            self.env['OMP_THREAD_LIMIT'] = '1'
+
+    def build_command(self, image_path: str, output_base: str = 'stdout') -> List[str]:
+        """Build the Tesseract command line for one page image."""
+        return [
+            self.spec.tesseract_cmd,
+            image_path,
+            output_base,
+            '--tessdata-dir',
+            self.spec.tessdata_dir,
+            '-l',
+            self.spec.languages
+        ]
+
+    def recognize(self, image_path: str, outputs: Sequence[str] = ('txt',)) -> Dict[str, Any]:
+        if list(outputs) == ['txt']:
+            return {'txt': run_tesseract(self.build_command(image_path), self.env)}
+
+        # Varios formatos: Tesseract escribe un fichero por config junto a la imagen
+        output_base = f"{os.path.splitext(image_path)[0]}.ocr"
+        run_tesseract(self.build_command(image_path, output_base) + list(outputs), self.env)
+        return read_outputs(output_base, outputs)
+
+
+class TesserocrEngine(OCREngine):
+    """
+    Keeps a Tesseract API instance in-process through ``tesserocr``.
+
+    The language models are loaded once when the engine is created and
+    reused for every page it recognizes afterwards.
+    """
+
+    name = 'tesserocr'
+
+    def __init__(self, spec: EngineSpec) -> None:
+        super().__init__(spec)
+        if spec.single_thread:
+            os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+        import tesserocr
+
+        self._api = tesserocr.PyTessBaseAPI(path=spec.tessdata_dir, lang=spec.languages)
+        logging.info(f"Loaded Tesseract models in-process: {spec.languages}")
+
+    def recognize(self, image_path: str, outputs: Sequence[str] = ('txt',)) -> Dict[str, Any]:
+        if 'pdf' in outputs:
+            return self._render(image_path, outputs)
+
+        self._api.SetImageFile(image_path)
+        self._api.Recognize()
+        getters = {
+            'txt': self._api.GetUTF8Text,
+            'tsv': lambda: self._api.GetTSVText(0),
+            'hocr': lambda: self._api.GetHOCRText(0),
+        }
+        results = {}
+        for output in outputs:
+            if output not in getters:
+                raise ValueError(f"Output not supported by the tesserocr engine: {output}")
+            results[output] = getters[output]()
+        return results
+
+    def _render(self, image_path: str, outputs: Sequence[str]) -> Dict[str, Any]:
+        """Produce file-based outputs (PDF) through Tesseract's result renderers in one pass."""
+        variables = {f"tessedit_create_{output}": '1' for output in outputs}
+        for name in variables:
+            self._api.SetVariable(name, '1')
+        output_base = f"{os.path.splitext(image_path)[0]}.ocr"
+        try:
+            if not self._api.ProcessPages(output_base, image_path):
+                raise RuntimeError(f"Tesseract could not process {image_path}")
+        finally:
+            for name in variables:
+                self._api.SetVariable(name, '0')
+        return read_outputs(output_base, outputs)
+
+    def close(self) -> None:
+        self._api.End()
+
+
+ENGINE_CLASSES = {
+    SubprocessEngine.name: SubprocessEngine,
+    TesserocrEngine.name: TesserocrEngine,
+}
+
+
+def create_engine(spec: EngineSpec) -> OCREngine:
+    """
+    Create the engine described by ``spec``.
+
+    The ``auto`` backend prefers the in-process engine and falls back to
+    the subprocess engine when ``tesserocr`` is not installed.
+
+    Args:
+        spec: Engine description
+
+    Returns:
+        OCREngine: A ready-to-use engine
+    """
+    if spec.backend == 'auto':
+        try:
+            return TesserocrEngine(spec)
+        except ImportError:
+            logging.info("tesserocr not installed, using the subprocess engine")
+            return SubprocessEngine(spec)
+
+    if spec.backend not in ENGINE_CLASSES:
+        raise ValueError(f"Unknown OCR engine: {spec.backend}")
+    return ENGINE_CLASSES[spec.backend](spec)
+
+
+_local = threading.local()
+
+
+def get_engine(spec: EngineSpec) -> OCREngine:
+    """
+    Return this thread's engine for ``spec``, creating it on first use.
+
+    Engines are cached per thread (and therefore per worker process), so a
+    pool worker keeps its models loaded across pages and documents.
+    """
+    engines = getattr(_local, 'engines', None)
+    if engines is None:
+        engines = _local.engines = {}
+    engine = engines.get(spec)
+    if engine is None:
+        engine = engines[spec] = create_engine(spec)
+    return engine
+
+
+def recognize_page(spec: EngineSpec, image_path: str, outputs: Sequence[str] = ('txt',)) -> Dict[str, Any]:
+    """
+    Recognize one page image with the worker's cached engine.
+
+    Defined at module level so it can be submitted to a process pool.
+    """
+    return get_engine(spec).recognize(image_path, outputs)
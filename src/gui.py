@@ -1,18 +1,22 @@
 import os
 import json
+import time
+import queue
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import threading
+from concurrent.futures import CancelledError
 from pathlib import Path
 import logging
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterable, Tuple
 import subprocess
 import pdf2image
 import pytesseract
 
 from .config import OCRConfig
-from .ocr_processor import PDFOCRExtractor
+from .ocr_processor import PDFOCRExtractor, PageResult
+from .output import TextOutputWriter
 from .constants import (
     APP_TITLE,
     APP_VERSION,
@@ -21,7 +25,9 @@ from .constants import (
     THEME_CONFIG,
     MAX_RECENT_FILES,
     OUTPUT_SUFFIX,
-    SETTINGS_FILE
+    CHECKPOINT_SUFFIX,
+    SETTINGS_FILE,
+    GUI_POLL_INTERVAL_MS
 )
 
 class ExpapyrusGUI:
@@ -37,8 +43,18 @@ class ExpapyrusGUI:
         self.is_processing = False
         self.processing_thread = None
 
+        # File queue and worker thread communication
+        self.file_queue: List[str] = []
+        self.events: "queue.Queue[Tuple[Any, ...]]" = queue.Queue()
+        self.cancel_event = threading.Event()
+        self._batch: List[Path] = []
+        self._current_index = 0
+        self._batch_start = 0.0
+        self._file_start = 0.0
+
         # Tkinter variables
-        self.file_var = tk.StringVar()
+        self.file_progress_var = tk.DoubleVar()
+        self.file_status_var = tk.StringVar()
         self.progress_var = tk.DoubleVar()
         self.status_var = tk.StringVar(value="Listo")
         self.dpi_var = tk.StringVar(value="300")
@@ -50,7 +66,10 @@ class ExpapyrusGUI:
         
         # GUI components
         self.main_frame = None
+        self.file_listbox = None
         self.process_button = None
+        self.cancel_button = None
+        self.file_progress_bar = None
         self.progress_bar = None
         self.menubar = None
         
@@ -61,6 +80,8 @@ class ExpapyrusGUI:
             self.create_widgets()
             self.create_menu()
             self.initialize_ocr()
+            self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+            self.root.after(GUI_POLL_INTERVAL_MS, self._poll_events)
         except Exception as e:
             logging.error(f"Error de inicialización: {e}")
             messagebox.showerror("Error", f"Error durante la inicialización:\n{str(e)}")
@@ -100,15 +121,20 @@ class ExpapyrusGUI:
         self.main_frame.grid(row=0, column=0, sticky="nsew")
         
         # Configure grid
-        for i in range(7):
+        for i in range(10):
             self.main_frame.grid_rowconfigure(i, weight=1)
         for i in range(3):
             self.main_frame.grid_columnconfigure(i, weight=1)
 
-        # File selection
-        ttk.Label(self.main_frame, text="Seleccionar PDF:").grid(row=0, column=0, sticky="e")
-        ttk.Entry(self.main_frame, textvariable=self.file_var, width=50).grid(row=0, column=1, padx=5)
-        ttk.Button(self.main_frame, text="Examinar", command=self.browse_file).grid(row=0, column=2, padx=5)
+        # File queue
+        ttk.Label(self.main_frame, text="Cola de PDFs:").grid(row=0, column=0, sticky="ne")
+        self.file_listbox = tk.Listbox(self.main_frame, height=6, width=50, selectmode=tk.EXTENDED)
+        self.file_listbox.grid(row=0, column=1, sticky="nsew", padx=5)
+        queue_buttons = ttk.Frame(self.main_frame)
+        queue_buttons.grid(row=0, column=2, sticky="n", padx=5)
+        ttk.Button(queue_buttons, text="Añadir", command=self.browse_file).pack(fill="x")
+        ttk.Button(queue_buttons, text="Quitar", command=self.remove_selected).pack(fill="x")
+        ttk.Button(queue_buttons, text="Vaciar", command=self.clear_queue).pack(fill="x")
 
         # DPI setting
         ttk.Label(self.main_frame, text="DPI:").grid(row=1, column=0, sticky="e")
@@ -123,20 +149,34 @@ class ExpapyrusGUI:
         # Auto-save option
         ttk.Checkbutton(self.main_frame, text="Auto-guardar", variable=self.auto_save_var).grid(row=3, column=0, columnspan=2, sticky="w")
 
-        # Progress bar
+        # Current file progress
+        self.file_progress_bar = ttk.Progressbar(self.main_frame, mode='determinate', variable=self.file_progress_var)
+        self.file_progress_bar.grid(row=4, column=0, columnspan=3, sticky="ew", pady=(10, 0))
+        ttk.Label(self.main_frame, textvariable=self.file_status_var).grid(row=5, column=0, columnspan=3)
+
+        # Overall progress
         self.progress_bar = ttk.Progressbar(self.main_frame, mode='determinate', variable=self.progress_var)
-        self.progress_bar.grid(row=4, column=0, columnspan=3, sticky="ew", pady=10)
+        self.progress_bar.grid(row=6, column=0, columnspan=3, sticky="ew", pady=(10, 0))
 
         # Status label
-        ttk.Label(self.main_frame, textvariable=self.status_var).grid(row=5, column=0, columnspan=3)
+        ttk.Label(self.main_frame, textvariable=self.status_var).grid(row=7, column=0, columnspan=3)
 
-        # Process button
+        # Process and cancel buttons
+        buttons = ttk.Frame(self.main_frame)
+        buttons.grid(row=8, column=0, columnspan=3, pady=10)
         self.process_button = ttk.Button(
-            self.main_frame, 
+            buttons, 
             text="Procesar", 
             command=self.process_file
         )
-        self.process_button.grid(row=6, column=1, pady=10)
+        self.process_button.pack(side="left", padx=5)
+        self.cancel_button = ttk.Button(
+            buttons,
+            text="Cancelar",
+            command=self.cancel_processing,
+            state='disabled'
+        )
+        self.cancel_button.pack(side="left", padx=5)
 
     def create_menu(self) -> None:
         """Crear menú de la aplicación."""
@@ -148,7 +188,7 @@ class ExpapyrusGUI:
         self.menubar.add_cascade(label="Archivo", menu=file_menu)
         file_menu.add_command(label="Abrir", command=self.browse_file)
         file_menu.add_separator()
-        file_menu.add_command(label="Salir", command=self.root.quit)
+        file_menu.add_command(label="Salir", command=self.on_close)
         
         # Help menu
         help_menu = tk.Menu(self.menubar, tearoff=0)
@@ -167,64 +207,204 @@ class ExpapyrusGUI:
             raise
 
     def browse_file(self) -> None:
-        """Abrir diálogo para seleccionar PDF."""
-        filename = filedialog.askopenfilename(
+        """Abrir diálogo para añadir PDFs a la cola."""
+        filenames = filedialog.askopenfilenames(
             title="Seleccionar PDF",
             filetypes=[("PDF files", "*.pdf")]
         )
-        if filename:
-            self.file_var.set(filename)
+        for filename in filenames:
+            if filename not in self.file_queue:
+                self.file_queue.append(filename)
+                self.file_listbox.insert(tk.END, filename)
             self._add_to_recent(filename)
 
+    def remove_selected(self) -> None:
+        """Quitar de la cola los archivos seleccionados."""
+        if self.is_processing:
+            return
+        for index in reversed(self.file_listbox.curselection()):
+            self.file_listbox.delete(index)
+            del self.file_queue[index]
+
+    def clear_queue(self) -> None:
+        """Vaciar la cola de archivos."""
+        if self.is_processing:
+            return
+        self.file_listbox.delete(0, tk.END)
+        self.file_queue.clear()
+
     def process_file(self) -> None:
-        """Procesar archivo PDF seleccionado."""
-        if not self.file_var.get():
-            messagebox.showwarning("Advertencia", "No se ha seleccionado ningún archivo PDF")
+        """Procesar uno tras otro los PDFs de la cola."""
+        if self.is_processing:
+            return
+        if not self.file_queue:
+            messagebox.showwarning("Advertencia", "No hay archivos PDF en la cola")
             return
         
+        self._batch = [Path(filename) for filename in self.file_queue]
+        self._current_index = 0
+        self._batch_start = time.monotonic()
+        for index in range(len(self._batch)):
+            self.file_listbox.itemconfig(index, foreground='black')
+        self.cancel_event.clear()
         self.process_button.config(state='disabled')
+        self.cancel_button.config(state='normal')
+        self.file_progress_var.set(0)
         self.progress_var.set(0)
         self.status_var.set("Procesando...")
         self.is_processing = True
         
         self.processing_thread = threading.Thread(
             target=self._process_thread, 
+            args=(list(self._batch), self.auto_save_var.get()),
             daemon=True
         )
         self.processing_thread.start()
 
-    def _process_thread(self) -> None:
-        """Hilo de procesamiento en segundo plano."""
+    def cancel_processing(self) -> None:
+        """Detener el procesamiento: las páginas en curso terminan, el resto se descarta."""
+        if not self.is_processing:
+            return
+        self.cancel_event.set()
+        self.cancel_button.config(state='disabled')
+        self.status_var.set("Cancelando...")
+
+    def on_close(self) -> None:
+        """Cancelar el trabajo pendiente y cerrar la ventana."""
+        self.cancel_event.set()
+        self.root.destroy()
+
+    def _process_thread(self, files: List[Path], auto_save: bool) -> None:
+        """
+        Hilo de procesamiento en segundo plano.
+
+        No toca ningún widget: todo se comunica con eventos en ``self.events``
+        que ``_poll_events`` atiende en el hilo de Tk.
+        """
+        failed = 0
         try:
-            pdf_path = Path(self.file_var.get())
-            extracted_text = self.extractor.process_pdf(pdf_path)
-            
-            if extracted_text and self.auto_save_var.get():
-                self._save_output(pdf_path, extracted_text)
-            
-            self.status_var.set("¡Procesamiento completado!")
-        except Exception as e:
-            logging.error(f"Error en el procesamiento: {e}")
-            self.status_var.set("Error en el procesamiento")
-            messagebox.showerror("Error", str(e))
+            for index, pdf_path in enumerate(files):
+                if self.cancel_event.is_set():
+                    break
+                self.events.put(('file_started', index))
+                try:
+                    message = self._process_pdf(pdf_path, auto_save)
+                except CancelledError:
+                    break
+                except Exception as e:
+                    logging.error(f"Error en el procesamiento de {pdf_path}: {e}")
+                    failed += 1
+                    self.events.put(('file_failed', index, str(e)))
+                else:
+                    self.events.put(('file_done', index, message))
         finally:
-            self.is_processing = False
-            self.process_button.config(state='normal')
+            self.events.put(('finished', self.cancel_event.is_set(), failed))
 
-    def _save_output(self, pdf_path: Path, text: str) -> None:
-        """Guardar texto extraído a archivo."""
+    def _process_pdf(self, pdf_path: Path, auto_save: bool) -> str:
+        """Procesar un PDF y devolver el mensaje de estado final."""
+        checkpoint_path = pdf_path.parent / f"{pdf_path.stem}{OUTPUT_SUFFIX}{CHECKPOINT_SUFFIX}"
+        pages = self.extractor.iter_pages(
+            pdf_path, checkpoint_path, ordered=False, cancel=self.cancel_event
+        )
+
+        if auto_save:
+            output_path = self._save_output(pdf_path, pages)
+            return f"Guardado en: {output_path.name}"
+        for _ in pages:
+            pass
+        return f"Completado: {pdf_path.name}"
+
+    def _save_output(self, pdf_path: Path, pages: Iterable[PageResult]) -> Path:
+        """Guardar el texto extraído a archivo a medida que se procesan las páginas."""
         try:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             output_path = pdf_path.parent / f"{pdf_path.stem}_{timestamp}{OUTPUT_SUFFIX}"
             
-            with open(output_path, 'w', encoding='utf-8') as f:
-                f.write(text)
+            with TextOutputWriter(output_path) as writer:
+                for result in pages:
+                    writer.write(result)
             
-            self.status_var.set(f"Guardado en: {output_path.name}")
+            return output_path
+        except CancelledError:
+            raise
         except Exception as e:
             logging.error(f"Error guardando archivo: {e}")
             raise
 
+    def _poll_events(self) -> None:
+        """Atender los eventos del hilo de procesamiento en el hilo de Tk."""
+        try:
+            while True:
+                event, *args = self.events.get_nowait()
+                getattr(self, f"_on_{event}")(*args)
+        except queue.Empty:
+            pass
+        except Exception as e:
+            logging.error(f"Error actualizando la interfaz: {e}")
+        self.root.after(GUI_POLL_INTERVAL_MS, self._poll_events)
+
+    def _on_file_started(self, index: int) -> None:
+        self._current_index = index
+        self._file_start = time.monotonic()
+        self.file_progress_var.set(0)
+        self.file_status_var.set(f"Archivo {index + 1}/{len(self._batch)}: {self._batch[index].name}")
+        self.file_listbox.see(index)
+        self.file_listbox.itemconfig(index, foreground='blue')
+        self._on_progress(0.0)
+
+    def _on_progress(self, value: float) -> None:
+        now = time.monotonic()
+        total = len(self._batch)
+        file_fraction = value / 100
+        overall_fraction = (self._current_index + file_fraction) / total
+        self.file_progress_var.set(value)
+        self.progress_var.set(overall_fraction * 100)
+        self.file_status_var.set(
+            f"Archivo {self._current_index + 1}/{total}: {self._batch[self._current_index].name} "
+            f"- {value:.0f}% - quedan {self._format_eta(now - self._file_start, file_fraction)}"
+        )
+        self.status_var.set(
+            f"Total: {overall_fraction * 100:.0f}% - "
+            f"quedan {self._format_eta(now - self._batch_start, overall_fraction)}"
+        )
+
+    def _on_file_done(self, index: int, message: str) -> None:
+        self.file_listbox.itemconfig(index, foreground='green')
+        self.file_progress_var.set(100)
+        self.file_status_var.set(message)
+
+    def _on_file_failed(self, index: int, error: str) -> None:
+        self.file_listbox.itemconfig(index, foreground='red')
+        self.file_status_var.set(f"Error en {self._batch[index].name}: {error}")
+
+    def _on_finished(self, cancelled: bool, failed: int) -> None:
+        self.is_processing = False
+        self.process_button.config(state='normal')
+        self.cancel_button.config(state='disabled')
+        # Los archivos completados salen de la cola; los demás quedan para reintentar
+        for index in reversed(range(len(self._batch))):
+            if self.file_listbox.itemcget(index, 'foreground') == 'green':
+                self.file_listbox.delete(index)
+                del self.file_queue[index]
+        if cancelled:
+            self.status_var.set("Procesamiento cancelado")
+        elif failed:
+            self.status_var.set(f"Procesamiento completado con {failed} errores")
+            messagebox.showerror("Error", f"{failed} de {len(self._batch)} archivos no se pudieron procesar")
+        else:
+            self.progress_var.set(100)
+            self.status_var.set("¡Procesamiento completado!")
+
+    @staticmethod
+    def _format_eta(elapsed: float, fraction: float) -> str:
+        """Tiempo restante estimado a ritmo constante, como h:mm:ss."""
+        if fraction <= 0:
+            return "--:--"
+        remaining = int(elapsed / fraction * (1 - fraction))
+        hours, rest = divmod(remaining, 3600)
+        minutes, seconds = divmod(rest, 60)
+        return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes:02d}:{seconds:02d}"
+
     def _add_to_recent(self, filepath: str) -> None:
         """Añadir archivo a lista de recientes."""
         if filepath in self.recent_files:
@@ -257,8 +437,8 @@ class ExpapyrusGUI:
             logging.error(f"Error saving settings: {e}")
 
     def update_progress(self, value: float) -> None:
-        """Actualizar barra de progreso."""
-        self.progress_var.set(value)
+        """Recibir el progreso del archivo en curso; se llama desde el hilo de procesamiento."""
+        self.events.put(('progress', value))
 
     def show_about(self) -> None:
         """Mostrar diálogo Acerca de."""
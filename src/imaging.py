@@ -0,0 +1,64 @@
+"""Helpers for the raw page rasters written by pdftoppm."""
+
+from typing import NamedTuple
+
+
+class Raster(NamedTuple):
+    """Decoded PNM image: 8-bit grey (1 channel) or RGB (3 channels)."""
+    width: int
+    height: int
+    channels: int
+    data: bytes
+
+
+def read_pnm(path: str) -> Raster:
+    """
+    Read a binary PGM (P5) or PPM (P6) file as written by pdftoppm.
+
+    Args:
+        path: Image file
+
+    Returns:
+        Raster: Image size, channel count and raw pixel bytes
+
+    Raises:
+        ValueError: If the file is not an 8-bit binary PGM/PPM
+    """
+    with open(path, 'rb') as f:
+        content = f.read()
+
+    fields = []
+    position = 0
+    while len(fields) < 4:
+        # Saltar espacios y comentarios de la cabecera
+        while content[position:position + 1].isspace():
+            position += 1
+        if content[position:position + 1] == b'#':
+            position = content.index(b'\n', position) + 1
+            continue
+        end = position
+        while end < len(content) and not content[end:end + 1].isspace():
+            end += 1
+        fields.append(content[position:end])
+        position = end
+    position += 1  # Un único espacio separa la cabecera de los píxeles
+
+    magic, width, height, maxval = fields[0], int(fields[1]), int(fields[2]), int(fields[3])
+    if magic not in (b'P5', b'P6') or maxval != 255:
+        raise ValueError(f"Unsupported image format in {path}: {magic!r}, maxval {maxval}")
+    channels = 1 if magic == b'P5' else 3
+    return Raster(width, height, channels, content[position:position + width * height * channels])
+
+
+def write_pnm(path: str, raster: Raster) -> None:
+    """
+    Write a raster as a binary PGM (1 channel) or PPM (3 channels).
+
+    Args:
+        path: Output file
+        raster: Image to write
+    """
+    magic = 'P5' if raster.channels == 1 else 'P6'
+    with open(path, 'wb') as f:
+        f.write(f"{magic}\n{raster.width} {raster.height}\n255\n".encode('ascii'))
+        f.write(raster.data)
@@ -0,0 +1,258 @@
+"""Full-text index of extracted pages in SQLite FTS5.
+
+Pages are added as they complete, together with their document's path,
+size and modification time and each page's method, OCR confidence and
+language. Re-indexing a document stages the new version next to the
+current one and swaps them when it is complete, so searches keep seeing
+the old text until then and other documents are never touched.
+
+Queries use the FTS5 syntax (words, ``"phrases"``, ``prefix*``, ``AND``,
+``OR``, ``NOT``, ``NEAR``) and return page or document hits ranked by
+BM25, with highlighted snippets.
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import threading
+from pathlib import Path
+from typing import List, NamedTuple, Optional, Sequence
+
+from .ocr_processor import PageResult
+from .constants import APP_TITLE, APP_VERSION, SNIPPET_TOKENS
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL,
+    size INTEGER,
+    mtime REAL,
+    pages INTEGER NOT NULL DEFAULT 0,
+    confidence REAL,
+    indexed_at REAL,
+    current INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS documents_path ON documents (path, current);
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY,
+    document_id INTEGER NOT NULL REFERENCES documents (id),
+    page_number INTEGER NOT NULL,
+    method TEXT,
+    confidence REAL,
+    language TEXT
+);
+CREATE INDEX IF NOT EXISTS pages_document ON pages (document_id, page_number);
+CREATE VIRTUAL TABLE IF NOT EXISTS page_text USING fts5 (
+    text, tokenize = 'unicode61 remove_diacritics 2'
+);
+"""
+
+
+class PageHit(NamedTuple):
+    """A page matching a query."""
+    path: str
+    page_number: int
+    snippet: str
+    score: float  # BM25, más negativo = más relevante
+    confidence: Optional[float]
+
+
+class DocumentHit(NamedTuple):
+    """A document with pages matching a query."""
+    path: str
+    matching_pages: int
+    best_page: int
+    score: float
+    confidence: Optional[float]
+
+
+class TextIndex:
+    """
+    SQLite FTS5 index of page texts.
+
+    One connection is shared by every thread and serialized with a lock.
+    Each page is committed on its own so documents processed concurrently
+    never wait on each other for long.
+
+    Args:
+        path: Database file, created if missing
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        try:
+            self._db.executescript(SCHEMA)
+        except sqlite3.OperationalError as e:
+            raise RuntimeError(f"SQLite FTS5 is not available: {e}") from e
+
+    def begin_document(self, pdf_path: Path) -> int:
+        """
+        Start a new version of a document's entry.
+
+        Leftovers of an earlier run of the same document that never
+        finished are removed; its current version stays searchable.
+
+        Returns:
+            int: Id to pass to ``add_page`` and ``finish_document``
+        """
+        path = str(Path(pdf_path).resolve())
+        stat = os.stat(path)
+        with self._lock, self._db:
+            self._delete(self._db.execute(
+                'SELECT id FROM documents WHERE path = ? AND current = 0', (path,)
+            ).fetchall())
+            cursor = self._db.execute(
+                'INSERT INTO documents (path, size, mtime) VALUES (?, ?, ?)',
+                (path, stat.st_size, stat.st_mtime)
+            )
+        return cursor.lastrowid
+
+    def add_page(self, document_id: int, result: PageResult) -> None:
+        """Index one finished page; pages without text are skipped."""
+        if result.text is None:
+            return
+        with self._lock, self._db:
+            cursor = self._db.execute(
+                'INSERT INTO pages (document_id, page_number, method, confidence, language) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (document_id, result.page_number, result.method, result.confidence, result.language)
+            )
+            self._db.execute('INSERT INTO page_text (rowid, text) VALUES (?, ?)', (cursor.lastrowid, result.text))
+
+    def finish_document(self, document_id: int) -> None:
+        """Make a staged version the searchable one, replacing the previous version."""
+        with self._lock, self._db:
+            path, = self._db.execute('SELECT path FROM documents WHERE id = ?', (document_id,)).fetchone()
+            self._delete(self._db.execute(
+                'SELECT id FROM documents WHERE path = ? AND id != ?', (path, document_id)
+            ).fetchall())
+            pages, confidence = self._db.execute(
+                'SELECT COUNT(*), AVG(confidence) FROM pages WHERE document_id = ?', (document_id,)
+            ).fetchone()
+            self._db.execute(
+                'UPDATE documents SET pages = ?, confidence = ?, indexed_at = ?, current = 1 WHERE id = ?',
+                (pages, confidence, time.time(), document_id)
+            )
+
+    def remove_document(self, pdf_path: Path) -> None:
+        """Drop every version of a document from the index."""
+        path = str(Path(pdf_path).resolve())
+        with self._lock, self._db:
+            self._delete(self._db.execute('SELECT id FROM documents WHERE path = ?', (path,)).fetchall())
+
+    def search(self, query: str, limit: int = 20) -> List[PageHit]:
+        """
+        Find the pages matching an FTS5 query, best first.
+
+        Raises:
+            ValueError: If the query is not valid FTS5 syntax
+        """
+        sql = f"""
+            SELECT d.path, p.page_number,
+                   snippet(page_text, 0, '[', ']', '…', {SNIPPET_TOKENS}),
+                   bm25(page_text) AS score, p.confidence
+            FROM page_text
+            JOIN pages p ON p.id = page_text.rowid
+            JOIN documents d ON d.id = p.document_id
+            WHERE page_text MATCH ? AND d.current = 1
+            ORDER BY score
+            LIMIT ?
+        """
+        return [PageHit(*row) for row in self._query(sql, (query, limit))]
+
+    def search_documents(self, query: str, limit: int = 20) -> List[DocumentHit]:
+        """
+        Find the documents with pages matching an FTS5 query, best first.
+
+        Raises:
+            ValueError: If the query is not valid FTS5 syntax
+        """
+        # MATERIALIZED: bm25() no se puede evaluar dentro de una consulta agregada
+        sql = """
+            WITH hits AS MATERIALIZED (
+                SELECT d.id, d.path, d.confidence, p.page_number, bm25(page_text) AS score
+                FROM page_text
+                JOIN pages p ON p.id = page_text.rowid
+                JOIN documents d ON d.id = p.document_id
+                WHERE page_text MATCH ? AND d.current = 1
+            )
+            SELECT path, COUNT(*), page_number, MIN(score), confidence
+            FROM hits
+            GROUP BY id
+            ORDER BY MIN(score)
+            LIMIT ?
+        """
+        # SQLite toma page_number de la fila con MIN(score)
+        return [DocumentHit(*row) for row in self._query(sql, (query, limit))]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self) -> 'TextIndex':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _query(self, sql: str, parameters: tuple) -> List[tuple]:
+        try:
+            with self._lock:
+                return self._db.execute(sql, parameters).fetchall()
+        except sqlite3.OperationalError as e:
+            raise ValueError(f"Invalid search query: {e}") from e
+
+    def _delete(self, rows: List[tuple]) -> None:
+        """Delete documents by id with their pages and texts; caller holds the lock."""
+        for document_id, in rows:
+            self._db.execute(
+                'DELETE FROM page_text WHERE rowid IN (SELECT id FROM pages WHERE document_id = ?)',
+                (document_id,)
+            )
+            self._db.execute('DELETE FROM pages WHERE document_id = ?', (document_id,))
+            self._db.execute('DELETE FROM documents WHERE id = ?', (document_id,))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the search command-line argument parser."""
+    parser = argparse.ArgumentParser(
+        prog='expapyrus-search',
+        description=f"{APP_TITLE} {APP_VERSION} - search an index built with expapyrus-cli --index"
+    )
+    parser.add_argument('index', type=Path, help="Index database")
+    parser.add_argument('query', help='FTS5 query, e.g. \'factura AND "2023"\' or \'contrat*\'')
+    parser.add_argument('-d', '--documents', action='store_true', help="List matching documents instead of pages")
+    parser.add_argument('-n', '--limit', type=int, default=20, help="Maximum hits (default: 20)")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Print the hits of a query, one per line."""
+    args = build_parser().parse_args(argv)
+    if not args.index.exists():
+        print(f"Index not found: {args.index}", file=sys.stderr)
+        return 2
+    with TextIndex(args.index) as index:
+        try:
+            if args.documents:
+                hits = index.search_documents(args.query, args.limit)
+                lines = [f"{hit.path}\t{hit.matching_pages} pages\tbest: page {hit.best_page}" for hit in hits]
+            else:
+                hits = index.search(args.query, args.limit)
+                lines = [f"{hit.path}:{hit.page_number}\t{' '.join(hit.snippet.split())}" for hit in hits]
+        except ValueError as e:
+            print(e, file=sys.stderr)
+            return 2
+    for line in lines:
+        print(line)
+    return 0 if lines else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,259 @@
+"""Per-page and per-document processing metrics.
+
+``PDFOCRExtractor`` reports every finished page and document to a
+``MetricsRecorder``. Callers can subscribe to those events with hooks, and
+the recorder keeps running totals that can be exported as JSON or in the
+Prometheus text exposition format (e.g. for node_exporter's textfile
+collector).
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import threading
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+METRIC_PREFIX = 'expapyrus'
+
+
+@dataclass
+class PageMetrics:
+    """
+    Measurements of one finished page.
+
+    ``timings`` holds seconds per stage: ``render`` (pdftoppm, the page's
+    share of its rendering run), ``ocr`` (the whole worker task, cache
+    lookup included), ``preprocess_<step>`` (image clean-up),
+    ``tesseract`` (engine calls only), ``encode``
+    (searchable PDF fragment) and ``assembly`` (checkpoint, PDF and output
+    writing). Stages a page did not go through are absent.
+    """
+    document: str
+    page_number: int
+    method: str
+    failed: bool
+    timings: Dict[str, float] = field(default_factory=dict)
+    temp_bytes: int = 0
+
+
+@dataclass
+class DocumentMetrics:
+    """
+    Measurements of one finished document.
+
+    CPU time and memory are process-wide: when several documents run at
+    once, each document's figures include the work of the others.
+    """
+    document: str
+    pages: int = 0
+    failed_pages: int = 0
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    rss_bytes: Optional[int] = None
+    peak_rss_bytes: Optional[int] = None
+    temp_bytes: int = 0
+    methods: Dict[str, int] = field(default_factory=dict)
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+
+    def add_page(self, page: PageMetrics) -> None:
+        self.pages += 1
+        self.failed_pages += page.failed
+        self.temp_bytes += page.temp_bytes
+        self.methods[page.method] = self.methods.get(page.method, 0) + 1
+        for stage, seconds in page.timings.items():
+            self.stage_seconds[stage] = self.stage_seconds.get(stage, 0.0) + seconds
+
+
+class ResourceUsage:
+    """Snapshot of this process's CPU time and memory."""
+
+    def __init__(self) -> None:
+        times = os.times()
+        # Incluye los procesos hijos ya terminados (Tesseract por subprocess)
+        self.cpu_seconds = times.user + times.system + times.children_user + times.children_system
+        self.wall = time.perf_counter()
+        self.rss_bytes, self.peak_rss_bytes = _memory()
+
+
+def _memory() -> Tuple[Optional[int], Optional[int]]:
+    """Current and peak resident set size in bytes, None when unavailable."""
+    rss = peak = None
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        rss = info.rss
+        peak = getattr(info, 'peak_wset', None)
+    except ImportError:
+        pass
+    if peak is None:
+        try:
+            import resource
+            # ru_maxrss viene en KB en Linux y en bytes en macOS
+            unit = 1 if sys.platform == 'darwin' else 1024
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * unit
+        except ImportError:
+            pass
+    return rss, peak
+
+
+PageHook = Callable[[PageMetrics], None]
+DocumentHook = Callable[[DocumentMetrics], None]
+
+
+class MetricsRecorder:
+    """
+    Collects page and document metrics and forwards them to hooks.
+
+    Hooks run on the thread that consumes ``iter_pages``; an exception in a
+    hook is logged and does not interrupt processing. All methods are
+    thread-safe, so one recorder can serve several documents at once.
+    """
+
+    def __init__(self) -> None:
+        self._page_hooks: List[PageHook] = []
+        self._document_hooks: List[DocumentHook] = []
+        self._documents: List[DocumentMetrics] = []
+        self._lock = threading.Lock()
+
+    def add_page_hook(self, hook: PageHook) -> None:
+        """Call ``hook`` with the PageMetrics of every finished page."""
+        self._page_hooks.append(hook)
+
+    def add_document_hook(self, hook: DocumentHook) -> None:
+        """Call ``hook`` with the DocumentMetrics of every finished document."""
+        self._document_hooks.append(hook)
+
+    def start_document(self, document: str) -> 'DocumentRun':
+        """Begin measuring a document."""
+        return DocumentRun(self, document)
+
+    def record_page(self, run: 'DocumentRun', page: PageMetrics) -> None:
+        run.metrics.add_page(page)
+        self._notify(self._page_hooks, page)
+
+    def record_document(self, metrics: DocumentMetrics) -> None:
+        with self._lock:
+            self._documents.append(metrics)
+        self._notify(self._document_hooks, metrics)
+
+    @property
+    def documents(self) -> List[DocumentMetrics]:
+        with self._lock:
+            return list(self._documents)
+
+    def totals(self) -> Dict[str, Any]:
+        """Aggregate every finished document."""
+        totals: Dict[str, Any] = {
+            'documents': 0,
+            'pages': 0,
+            'failed_pages': 0,
+            'wall_seconds': 0.0,
+            'cpu_seconds': 0.0,
+            'temp_bytes': 0,
+            'peak_rss_bytes': None,
+            'methods': {},
+            'stage_seconds': {},
+        }
+        for document in self.documents:
+            totals['documents'] += 1
+            for key in ('pages', 'failed_pages', 'wall_seconds', 'cpu_seconds', 'temp_bytes'):
+                totals[key] += getattr(document, key)
+            if document.peak_rss_bytes is not None:
+                totals['peak_rss_bytes'] = max(totals['peak_rss_bytes'] or 0, document.peak_rss_bytes)
+            for method, count in document.methods.items():
+                totals['methods'][method] = totals['methods'].get(method, 0) + count
+            for stage, seconds in document.stage_seconds.items():
+                totals['stage_seconds'][stage] = totals['stage_seconds'].get(stage, 0.0) + seconds
+        return totals
+
+    def to_json(self) -> str:
+        """Totals plus every document's metrics, as JSON."""
+        return json.dumps(
+            {'totals': self.totals(), 'documents': [asdict(d) for d in self.documents]},
+            indent=2
+        )
+
+    def to_prometheus(self) -> str:
+        """Totals in the Prometheus text exposition format."""
+        totals = self.totals()
+        lines: List[str] = []
+
+        def metric(name: str, kind: str, help_text: str, samples: Dict[str, Any]) -> None:
+            full_name = f"{METRIC_PREFIX}_{name}"
+            lines.append(f"# HELP {full_name} {help_text}")
+            lines.append(f"# TYPE {full_name} {kind}")
+            for labels, value in samples.items():
+                lines.append(f"{full_name}{labels} {value}")
+
+        metric('documents_total', 'counter', "Documents processed.", {'': totals['documents']})
+        metric('pages_total', 'counter', "Pages processed, by how their text was obtained.",
+               {f'{{method="{method}"}}': count for method, count in sorted(totals['methods'].items())})
+        metric('failed_pages_total', 'counter', "Pages that could not be processed.",
+               {'': totals['failed_pages']})
+        metric('stage_seconds_total', 'counter', "Time spent per processing stage.",
+               {f'{{stage="{stage}"}}': round(seconds, 6)
+                for stage, seconds in sorted(totals['stage_seconds'].items())})
+        metric('document_seconds_total', 'counter', "Wall time spent on documents.",
+               {'': round(totals['wall_seconds'], 6)})
+        metric('cpu_seconds_total', 'counter', "Process and child CPU time spent on documents.",
+               {'': round(totals['cpu_seconds'], 6)})
+        metric('temp_bytes_total', 'counter', "Bytes written to temporary storage.",
+               {'': totals['temp_bytes']})
+        if totals['peak_rss_bytes'] is not None:
+            metric('peak_rss_bytes', 'gauge', "Peak resident memory of the process.",
+                   {'': totals['peak_rss_bytes']})
+        return '\n'.join(lines) + '\n'
+
+    def write_json(self, path: Path) -> None:
+        """Write ``to_json()`` to a file."""
+        _write_atomic(Path(path), self.to_json())
+
+    def write_prometheus(self, path: Path) -> None:
+        """Write ``to_prometheus()`` to a file, replacing it atomically."""
+        _write_atomic(Path(path), self.to_prometheus())
+
+    @staticmethod
+    def _notify(hooks: List[Callable], value: Any) -> None:
+        for hook in hooks:
+            try:
+                hook(value)
+            except Exception as e:
+                logging.error(f"Metrics hook failed: {e}")
+
+
+class DocumentRun:
+    """Measurements in progress for one document."""
+
+    def __init__(self, recorder: MetricsRecorder, document: str) -> None:
+        self.recorder = recorder
+        self.metrics = DocumentMetrics(document)
+        self._start = ResourceUsage()
+
+    def page(self, page_number: int, method: str, failed: bool,
+             timings: Dict[str, float], temp_bytes: int) -> None:
+        """Record one finished page."""
+        self.recorder.record_page(
+            self,
+            PageMetrics(self.metrics.document, page_number, method, failed, dict(timings), temp_bytes)
+        )
+
+    def finish(self) -> DocumentMetrics:
+        """Close the document's measurements and report them."""
+        end = ResourceUsage()
+        self.metrics.wall_seconds = end.wall - self._start.wall
+        self.metrics.cpu_seconds = end.cpu_seconds - self._start.cpu_seconds
+        self.metrics.rss_bytes = end.rss_bytes
+        self.metrics.peak_rss_bytes = end.peak_rss_bytes
+        self.recorder.record_document(self.metrics)
+        return self.metrics
+
+
+def _write_atomic(path: Path, content: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = path.with_name(path.name + '.tmp')
+    temp_path.write_text(content, encoding='utf-8')
+    os.replace(temp_path, path)
@@ -1,66 +1,1054 @@
-import subprocess
 import logging
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    CancelledError,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait
+)
+from dataclasses import asdict, dataclass, field, fields
+from itertools import chain
 from pathlib import Path
-from typing import List
-from pdf2image import convert_from_path
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
 import tempfile
+import threading
+import base64
+import json
+import time
 import os
 
+from .cache import get_cache, hash_file
+from .checkpoint import Checkpoint, document_fingerprint
+from .metrics import MetricsRecorder
+from .pdf_writer import SearchablePDFWriter, build_page_fragment
+from .constants import BLANK_PAGE_MARKER, CANCEL_POLL_INTERVAL, GEOMETRIC_PREPROCESSING_STEPS
+from .engines import BINARY_OUTPUTS, EngineSpec, mean_confidence, recognize_page
+from .language import detect_language
+
+
+@dataclass
+class PageResult:
+    """Outcome of processing one page."""
+    page_number: int
+    text: Optional[str] = None
+    method: str = 'ocr'
+    error: Optional[str] = None
+    confidence: Optional[float] = None
+    dpi: Optional[int] = None
+    language: Optional[str] = None  # Modelos de Tesseract usados
+    outputs: Dict[str, Any] = field(default_factory=dict)
+    timings: Dict[str, float] = field(default_factory=dict)  # Segundos por etapa
+    temp_bytes: int = 0  # Bytes escritos en el directorio temporal
+    pdf_page: Optional[str] = None  # Fragmento temporal para el PDF buscable
+    duplicate_of: Optional[str] = None  # "<pdf>#<página>" cuyo resultado se reutilizó
+
+
+def page_entry(result: PageResult) -> Dict[str, Any]:
+    """Convert a PageResult to a JSON-serializable dict (binary outputs as base64)."""
+    entry = asdict(result)
+    del entry['pdf_page']
+    entry['outputs'] = {
+        name: base64.b64encode(value).decode('ascii') if name in BINARY_OUTPUTS else value
+        for name, value in result.outputs.items()
+    }
+    return entry
+
+
+def page_result(entry: Dict[str, Any]) -> PageResult:
+    """Rebuild a PageResult from its ``page_entry`` form, ignoring unknown keys."""
+    names = {f.name for f in fields(PageResult)}
+    values = {key: value for key, value in entry.items() if key in names}
+    values['outputs'] = {
+        name: base64.b64decode(value) if name in BINARY_OUTPUTS else value
+        for name, value in values.get('outputs', {}).items()
+    }
+    return PageResult(**values)
+
+
+class PageOptions(NamedTuple):
+    """Per-document settings shipped to pool workers with every page."""
+    engine: EngineSpec
+    formats: Tuple[str, ...] = ('txt',)
+    pdf_path: str = ''
+    render_dir: str = ''
+    dpi: int = 0
+    grayscale: bool = False
+    high_dpi: int = 0
+    confidence_threshold: float = 0.0
+    cache_dir: Optional[str] = None
+    cache_max_bytes: int = 0
+    cache_salt: str = ''
+    pdf_layer: bool = False
+    preprocessing: Tuple[str, ...] = ()
+    target_text_height: int = 0
+    blank: bool = False
+    auto_language: bool = False
+    language_fallback_confidence: float = 0.0
+    language_hint: str = ''
+
+
+def render_pages(pdf_path: str, first_page: int, last_page: int, dpi: int,
+                 grayscale: bool, output_folder: str) -> List[str]:
+    """
+    Render a range of pages with pdftoppm.
+
+    Returns:
+        List[str]: Paths of the uncompressed PPM/PGM images, in page order
+    """
+    from pdf2image import convert_from_path
+
+    return convert_from_path(
+        pdf_path,
+        dpi=dpi,
+        output_folder=output_folder,
+        first_page=first_page,
+        last_page=last_page,
+        grayscale=grayscale,
+        paths_only=True
+    )
+
+
+def ocr_page(options: PageOptions, page_number: int, image_path: str) -> PageResult:
+    """
+    OCR one rendered page, consulting the result cache first when enabled.
+
+    When building a searchable PDF, the page's PDF fragment (image plus
+    invisible text) is prepared here as well, so compression runs in the
+    pool. A page whose OCR fails still gets an image-only fragment.
+
+    Defined at module level so it can be submitted to a process pool.
+
+    Args:
+        options: Per-document settings
+        page_number: 1-based page number
+        image_path: Rendered page image
+
+    Returns:
+        PageResult: The page's text and how it was obtained
+    """
+    start = time.perf_counter()
+    if options.blank:
+        # Página en blanco: solo hace falta su imagen para el PDF buscable
+        result = PageResult(page_number, BLANK_PAGE_MARKER, method='blank')
+    elif not options.pdf_layer:
+        result = _ocr_cached(options, page_number, image_path)
+    else:
+        try:
+            result = _ocr_cached(options, page_number, image_path)
+        except Exception as e:
+            result = PageResult(page_number, error=str(e))
+    result.timings['ocr'] = time.perf_counter() - start
+    if not options.pdf_layer:
+        return result
+
+    start = time.perf_counter()
+    result.pdf_page = build_page_fragment(
+        image_path,
+        result.outputs.get('tsv'),
+        options.dpi,
+        result.dpi or options.dpi,
+        f"{image_path}.pdfpage"
+    )
+    result.timings['encode'] = time.perf_counter() - start
+    result.temp_bytes += os.path.getsize(result.pdf_page)
+    return result
+
+
+def _ocr_cached(options: PageOptions, page_number: int, image_path: str) -> PageResult:
+    """Look the page up in the result cache, recognizing and storing it on a miss."""
+    cache = None
+    if options.cache_dir:
+        cache = get_cache(options.cache_dir, options.cache_max_bytes)
+        key = hash_file(image_path, options.cache_salt)
+        entry = cache.get(key)
+        if entry is not None:
+            return page_result({
+                **entry, 'page_number': page_number, 'method': 'cache', 'timings': {}, 'temp_bytes': 0
+            })
+
+    result = _recognize(options, page_number, image_path)
+    if cache is not None:
+        cache.put(key, page_entry(result))
+    return result
+
+
+def _recognize(options: PageOptions, page_number: int, image_path: str) -> PageResult:
+    """
+    Run the OCR engine on a page, producing every requested format in one pass.
+
+    In adaptive mode (``options.high_dpi`` set) the page was rendered at a
+    low resolution; if the mean word confidence of that pass is below
+    ``options.confidence_threshold`` the page is rendered again at
+    ``high_dpi`` and recognized once more.
+
+    With ``options.preprocessing`` set, each image is cleaned up first and
+    the reported ``dpi`` accounts for any downscaling, so TSV/hOCR
+    coordinates can be mapped back onto the page.
+
+    With ``options.auto_language`` the page is recognized with a single
+    language model where possible, see ``_select_language``. A high
+    resolution pass reuses the languages chosen in the first pass.
+    """
+    formats = options.formats
+    if (options.high_dpi or options.auto_language) and 'tsv' not in formats:
+        formats += ('tsv',)
+
+    timings: Dict[str, float] = {}
+    temp_bytes = 0
+    # Con auto_language, vacío hasta que la primera pasada elige los idiomas
+    language = '' if options.auto_language else options.engine.languages
+
+    def tesseract(path: str, languages: str) -> Dict[str, Any]:
+        start = time.perf_counter()
+        outputs = recognize_page(options.engine._replace(languages=languages), path, formats)
+        timings['tesseract'] = timings.get('tesseract', 0.0) + time.perf_counter() - start
+        return outputs
+
+    def recognize(path: str, dpi: int) -> Tuple[Dict[str, Any], int]:
+        nonlocal language
+        nonlocal temp_bytes
+        ocr_path = path
+        if options.preprocessing:
+            from .preprocessing import preprocess_image
+
+            ocr_path = f"{path}.pre.pnm"
+            scale, step_timings = preprocess_image(
+                path, ocr_path, options.preprocessing, options.target_text_height
+            )
+            for step, seconds in step_timings.items():
+                timings[step] = timings.get(step, 0.0) + seconds
+            temp_bytes += os.path.getsize(ocr_path)
+            dpi = round(dpi * scale)
+        try:
+            if not language:
+                outputs, language = _select_language(options, page_number, ocr_path, tesseract)
+            else:
+                outputs = tesseract(ocr_path, language)
+        finally:
+            if ocr_path != path:
+                os.remove(ocr_path)
+        return outputs, dpi
+
+    outputs, dpi = recognize(image_path, options.dpi)
+    if options.high_dpi and mean_confidence(outputs['tsv']) < options.confidence_threshold:
+        logging.debug(f"Page {page_number}: low confidence, re-OCR at {options.high_dpi} DPI")
+        start = time.perf_counter()
+        high_path = render_pages(
+            options.pdf_path, page_number, page_number,
+            options.high_dpi, options.grayscale, options.render_dir
+        )[0]
+        timings['render'] = time.perf_counter() - start
+        temp_bytes += os.path.getsize(high_path)
+        try:
+            outputs, dpi = recognize(high_path, options.high_dpi)
+        finally:
+            os.remove(high_path)
+
+    return PageResult(
+        page_number,
+        outputs['txt'],
+        confidence=mean_confidence(outputs['tsv']) if 'tsv' in outputs else None,
+        dpi=dpi,
+        language=language,
+        outputs={name: outputs[name] for name in options.formats if name != 'txt'},
+        timings=timings,
+        temp_bytes=temp_bytes
+    )
+
+
+def _select_language(options: PageOptions, page_number: int, image_path: str,
+                     tesseract) -> Tuple[Dict[str, Any], str]:
+    """
+    Recognize a page with the smallest language set that fits it.
+
+    The page is first read with one model: the language of the document's
+    previous pages (``options.language_hint``) or the first of the combo.
+    If the text reads as another language of the combo, that model is
+    used instead. Only when the language could not be identified and
+    confidence is below ``options.language_fallback_confidence`` is the
+    full combo run.
+
+    Args:
+        options: Per-document settings
+        page_number: 1-based page number, for logging
+        image_path: Image to recognize
+        tesseract: Callable running Tesseract on a path with a language string
+
+    Returns:
+        Tuple[Dict[str, Any], str]: Outputs and the languages they were read with
+    """
+    combo = options.engine.languages
+    candidates = combo.split('+')
+    if len(candidates) == 1:
+        return tesseract(image_path, combo), combo
+
+    language = options.language_hint if options.language_hint in candidates else candidates[0]
+    outputs = tesseract(image_path, language)
+    detected = detect_language(outputs['txt'], candidates)
+    if detected and detected != language:
+        language = detected
+        outputs = tesseract(image_path, language)
+
+    # Un idioma identificado ya es el modelo correcto: el combo no mejoraría la página
+    if detected is None and mean_confidence(outputs['tsv']) < options.language_fallback_confidence:
+        logging.debug(f"Page {page_number}: low confidence with {language}, using {combo}")
+        return tesseract(image_path, combo), combo
+    return outputs, language
+
+
+def _fingerprint_page(image_path: str) -> Tuple[Any, float]:
+    """Fingerprint a page image for deduplication, with the seconds it took."""
+    from .dedup import page_fingerprint
+
+    start = time.perf_counter()
+    fingerprint = page_fingerprint(image_path)
+    return fingerprint, time.perf_counter() - start
+
+
+def _forward(own: Future, target: Future, page_number: int) -> None:
+    """Pass the PageResult of ``own`` on to a running ``target`` future."""
+    try:
+        target.set_result(own.result())
+    except Exception as e:
+        target.set_result(PageResult(page_number, error=f"OCR failed: {e!r}"))
+
+
+def _check_cancel(cancel: Optional[threading.Event]) -> None:
+    """Raise ``CancelledError`` once ``cancel`` is set."""
+    if cancel is not None and cancel.is_set():
+        raise CancelledError()
+
+
 class PDFOCRExtractor:
     def __init__(self, config):
         self.config = config
         self.update_progress = None
+        self.metrics = MetricsRecorder()
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._executor: Optional[Executor] = None
+        self._executor_key: Optional[Tuple[str, int]] = None
+        self._page_hashes = None  # PageHashIndex, creado con la primera página
+        self._lock = threading.Lock()
+
+    def process_pdf(self, pdf_path: Path, checkpoint_path: Optional[Path] = None) -> str:
+        extracted_text = [
+            result.text for result in self.iter_pages(pdf_path, checkpoint_path)
+            if result.text is not None
+        ]
+        return '\n\n'.join(extracted_text)
+
+    def iter_pages(self, pdf_path: Path, checkpoint_path: Optional[Path] = None,
+                   ordered: bool = True,
+                   searchable_pdf: Optional[Path] = None,
+                   cancel: Optional[threading.Event] = None,
+                   page_range: Optional[Tuple[int, int]] = None) -> Iterator[PageResult]:
+        """
+        Process a PDF page by page, yielding each page as soon as it is done.
+
+        With ``config.use_text_layer`` enabled, pages whose embedded text
+        layer already holds at least ``config.min_text_layer_chars``
+        characters are taken from it and never rendered; only the remaining
+        pages go through rendering and OCR.
+
+        With a ``checkpoint_path``, every finished page is appended to that
+        file as it completes. A later call with the same input and settings
+        replays the recorded pages and only processes the rest. The
+        checkpoint is deleted once every page has succeeded.
+
+        Results come in document order by default. With ``ordered=False``
+        each page is yielded the moment its worker finishes, which avoids
+        waiting behind a slow page; ``TextOutputWriter`` restores the order
+        when writing.
 
-    def process_pdf(self, pdf_path: Path) -> str:
+        With ``searchable_pdf``, a copy of the document made of the page
+        images plus an invisible OCR text layer is written to that path.
+        Pages are appended as they finish, so the file grows with the run
+        and no more than one page is held in memory. Every page needs its
+        raster for this, so the text-layer shortcut and checkpoint resume
+        are not used in this mode.
+
+        Args:
+            pdf_path: PDF to process
+            checkpoint_path: Optional checkpoint file for resuming
+            ordered: Yield pages in document order rather than completion order
+            searchable_pdf: Optional path of a searchable PDF to build
+            cancel: Optional event; once set, no further pages are queued,
+                queued pages are dropped and ``CancelledError`` is raised
+                within ``CANCEL_POLL_INTERVAL`` seconds, or once the
+                current render window, thumbnail batch or text layer page
+                is done. Pages are then rendered in windows of
+                ``config.max_pages_in_memory`` even outside streaming
+                mode. Pages already running finish first, and finished
+                pages stay in the checkpoint so the document can be resumed
+            page_range: Optional first and last page (1-based, inclusive)
+                to process instead of the whole document
+
+        With ``config.dedup``, each rendered page is compared with the pages
+        processed so far (see ``src/dedup.py``); a copy reuses the earlier
+        result with ``method='dedup'`` and ``duplicate_of`` naming the
+        original page. Searchable PDF output needs every page's own text
+        layer, so it does not deduplicate.
+
+        With ``config.detect_blank_pages``, the remaining pages are first
+        rendered as small thumbnails; those with an ink density below
+        ``config.blank_threshold`` get ``BLANK_PAGE_MARKER`` as their text
+        without being rendered at full resolution or OCR'd.
+
+        Every page and the document as a whole are reported to
+        ``self.metrics`` with their stage timings, temporary storage use and,
+        per document, CPU time and memory. The ``assembly`` stage covers the
+        checkpoint, searchable PDF and whatever the caller does with the
+        page before asking for the next one.
+
+        Yields:
+            PageResult: One result per page, its ``method`` telling whether
+            it came from the text layer, the cache, OCR or blank detection
+        """
+        run = self.metrics.start_document(str(pdf_path))
+        checkpoint = None
+        pdf_writer = None
+        if searchable_pdf and (checkpoint_path or self.config.use_text_layer):
+            logging.warning("Searchable PDF output re-renders every page: ignoring checkpoint and text layer")
+            checkpoint_path = None
+        if searchable_pdf and set(self.config.preprocessing) & set(GEOMETRIC_PREPROCESSING_STEPS):
+            logging.warning("Searchable PDF output keeps page geometry: skipping deskew and crop")
+        if searchable_pdf and self.config.dedup:
+            logging.warning("Searchable PDF output recognizes every page: skipping deduplication")
         try:
-            # Convertir PDF a imágenes
             with tempfile.TemporaryDirectory() as temp_dir:
-                logging.info(f"Converting PDF to images: {pdf_path}")
-                images = convert_from_path(
-                    pdf_path, 
-                    dpi=self.config.dpi,
-                    output_folder=temp_dir
+                page_count = self._page_count(pdf_path)
+                first_page, last_page = page_range or (1, page_count)
+                last_page = min(last_page, page_count)
+                total_pages = max(last_page - first_page + 1, 0)
+                if searchable_pdf:
+                    pdf_writer = SearchablePDFWriter(searchable_pdf)
+
+                known: Dict[int, PageResult] = {}
+                if checkpoint_path:
+                    checkpoint = Checkpoint(
+                        checkpoint_path,
+                        document_fingerprint(pdf_path, self._settings())
+                    )
+                    known = {
+                        n: page_result({**entry, 'timings': {}, 'temp_bytes': 0})
+                        for n, entry in checkpoint.load().items()
+                        if first_page <= n <= last_page
+                    }
+                    if known:
+                        logging.info(f"Resuming {pdf_path}: {len(known)} pages already done")
+                resumed = set(known)
+
+                remaining = [n for n in range(first_page, last_page + 1) if n not in known]
+                if self.config.use_text_layer and pdf_writer is None:
+                    for page_number, text in self._text_layer_pages(pdf_path, remaining, cancel).items():
+                        known[page_number] = PageResult(page_number, text, method='text_layer')
+                ocr_pages = [n for n in remaining if n not in known]
+                blank: Dict[int, float] = {}
+                if self.config.detect_blank_pages and ocr_pages:
+                    blank = self._blank_pages(pdf_path, temp_dir, ocr_pages, cancel)
+                    if pdf_writer is None:
+                        for page_number, seconds in blank.items():
+                            known[page_number] = PageResult(
+                                page_number, BLANK_PAGE_MARKER, method='blank',
+                                timings={'blank_check': seconds}
+                            )
+                        ocr_pages = [n for n in ocr_pages if n not in blank]
+                logging.info(
+                    f"Converting PDF to images: {pdf_path} "
+                    f"({len(ocr_pages)} of {total_pages} pages need OCR)"
                 )
-                
-                extracted_text = []
-                total_pages = len(images)
-                
-                for i, image in enumerate(images):
-                    # Guardar imagen temporalmente
-                    image_path = os.path.join(temp_dir, f'page_{i}.png')
-                    image.save(image_path)
-                    
-                    # Procesar imagen con Tesseract
-                    command = [
-                        self.config.tesseract_cmd,
-                        image_path,
-                        'stdout',
-                        '--tessdata-dir',
-                        self.config.tessdata_dir,
-                        '-l',
-                        '+'.join(self.config.languages)
-                    ]
-                    
-                    logging.debug(f"Running Tesseract command: {' '.join(command)}")
-                    
-                    result = subprocess.run(
-                        command,
-                        capture_output=True,
-                        text=True,
-                        check=False  # No lanzar excepción en error
+
+                rendered = self._render_pages(pdf_path, temp_dir, ocr_pages, cancel)
+                options = self._page_options(pdf_path, temp_dir, pdf_layer=pdf_writer is not None)
+                ocr_results = self._ocr_pages(rendered, options, ordered, blank, cancel)
+                if ordered:
+                    results = self._merge_known(known, ocr_results)
+                else:
+                    results = chain((known[n] for n in sorted(known)), ocr_results)
+                counts: Dict[str, int] = {}
+                for done, result in enumerate(results, start=1):
+                    start = time.perf_counter()
+                    outcome = 'failed' if result.error else result.method
+                    counts[outcome] = counts.get(outcome, 0) + 1
+                    if checkpoint is not None and result.error is None and result.page_number not in resumed:
+                        checkpoint.record(page_entry(result))
+                    if pdf_writer is not None:
+                        pdf_writer.add_page(result.page_number, result.pdf_page)
+                        result.pdf_page = None
+                    self._report_progress(done, total_pages)
+                    yield result
+                    result.timings['assembly'] = time.perf_counter() - start
+                    run.page(
+                        result.page_number, result.method, result.error is not None,
+                        result.timings, result.temp_bytes
                     )
-                    
-                    if result.returncode != 0:
-                        logging.error(f"Tesseract error: {result.stderr}")
-                    else:
-                        extracted_text.append(result.stdout)
-                    
-                    if self.update_progress:
-                        progress = ((i + 1) / total_pages) * 100
-                        self.update_progress(progress)
-                
-                return '\n\n'.join(extracted_text)
-                
+
+                if pdf_writer is not None:
+                    pdf_writer.close()
+                    logging.info(f"Saved searchable PDF: {searchable_pdf}")
+                self._log_summary(pdf_path, counts)
+                if checkpoint is not None and not counts.get('failed'):
+                    checkpoint.remove()
+                run.finish()
+
+        except CancelledError:
+            logging.info(f"Cancelled processing of {pdf_path}")
+            raise
         except Exception as e:
             logging.error(f"PDF processing failed: {e}", exc_info=True)
-            raise
\ No newline at end of file
+            raise
+        finally:
+            if checkpoint is not None:
+                checkpoint.close()
+            if pdf_writer is not None:
+                # Sin efecto si ya se cerró con éxito; si no, descarta el PDF a medias
+                pdf_writer.abort()
+
+    def _settings(self) -> Dict[str, Any]:
+        """Settings that change the extracted text, used to validate checkpoints."""
+        return {
+            'languages': self.config.get_languages_string(),
+            'dpi': self.config.dpi,
+            'grayscale': self.config.grayscale,
+            'engine': self.config.engine,
+            'adaptive_dpi': self.config.adaptive_dpi,
+            'low_dpi': self.config.low_dpi,
+            'confidence_threshold': self.config.confidence_threshold,
+            'output_formats': self.config.output_formats,
+            'preprocessing': self.config.preprocessing,
+            'target_text_height': self.config.target_text_height,
+            'use_text_layer': self.config.use_text_layer,
+            'min_text_layer_chars': self.config.min_text_layer_chars,
+            'detect_blank_pages': self.config.detect_blank_pages,
+            'blank_threshold': self.config.blank_threshold,
+            'auto_language': self.config.auto_language,
+            'language_fallback_confidence': self.config.language_fallback_confidence,
+            'dedup': self.config.dedup,
+            'dedup_threshold': self.config.dedup_threshold,
+        }
+
+    def _log_summary(self, pdf_path: Path, counts: Dict[str, int]) -> None:
+        """Log how each page was obtained and update the cache counters."""
+        summary = ', '.join(f"{count} {method}" for method, count in sorted(counts.items()))
+        logging.info(f"Processed {pdf_path}: {summary or 'no pages'}")
+        if self.config.cache_dir:
+            hits = counts.get('cache', 0)
+            misses = counts.get('ocr', 0)
+            with self._lock:
+                self.cache_hits += hits
+                self.cache_misses += misses
+            logging.info(f"OCR cache: {hits} hits, {misses} misses")
+
+    def _page_count(self, pdf_path: Path) -> int:
+        """Read the page count from the PDF without rendering it."""
+        from pdf2image import pdfinfo_from_path
+
+        return int(pdfinfo_from_path(pdf_path)['Pages'])
+
+    def _text_layer_pages(self, pdf_path: Path, page_numbers: List[int],
+                          cancel: Optional[threading.Event] = None) -> Dict[int, str]:
+        """
+        Read the embedded text layer of the given pages with pdfminer.
+
+        Args:
+            pdf_path: PDF to inspect
+            page_numbers: 1-based pages to read, ascending
+            cancel: Optional event checked before each page
+
+        Returns:
+            Dict[int, str]: Text of the pages with enough native text, by page number
+        """
+        from pdfminer.high_level import extract_pages
+        from pdfminer.layout import LTTextContainer
+
+        pages: Dict[int, str] = {}
+        if not page_numbers:
+            return pages
+        try:
+            layouts = extract_pages(str(pdf_path), page_numbers=[n - 1 for n in page_numbers])
+            for page_number, layout in zip(page_numbers, layouts):
+                _check_cancel(cancel)
+                text = ''.join(
+                    element.get_text() for element in layout
+                    if isinstance(element, LTTextContainer)
+                )
+                if len(text.strip()) >= self.config.min_text_layer_chars:
+                    pages[page_number] = text
+        except CancelledError:
+            raise
+        except Exception as e:
+            # Sin capa de texto legible: todo pasa por OCR
+            logging.warning(f"Could not read text layer of {pdf_path}: {e}")
+            return {}
+        return pages
+
+    def _merge_known(self, known: Dict[int, PageResult], ocr_results: Iterable[PageResult]) -> Iterator[PageResult]:
+        """Interleave pages that needed no OCR with OCR results in page order."""
+        ready = [known[n] for n in sorted(known)]
+        position = 0
+        for result in ocr_results:
+            while position < len(ready) and ready[position].page_number < result.page_number:
+                yield ready[position]
+                position += 1
+            yield result
+        yield from ready[position:]
+
+    def _render_pages(self, pdf_path: Path, temp_dir: str, page_numbers: List[int],
+                      cancel: Optional[threading.Event] = None) -> Iterator[Optional[Tuple[int, str, float]]]:
+        """
+        Render pages to image files, yielding them as they become available.
+
+        pdftoppm writes uncompressed PPM/PGM rasters that Tesseract reads
+        directly, so pages are never decoded or re-encoded in Python.
+
+        Consecutive pages are rendered together. Outside streaming mode each
+        run is rendered in one go. In streaming mode runs are split into
+        windows of half ``config.max_pages_in_memory`` pages, and ``None``
+        is yielded before each window after the first: the caller then
+        finishes pages until the next window fits, so no more than
+        ``config.max_pages_in_memory`` page images exist at once while the
+        other half is still being recognized. With ``cancel``, runs are
+        split into windows of ``config.max_pages_in_memory`` so a
+        cancellation is seen between them.
+
+        Args:
+            pdf_path: PDF to render
+            temp_dir: Directory for rendered page images
+            page_numbers: 1-based pages to render, ascending
+            cancel: Optional event checked before each window
+
+        Yields:
+            Optional[Tuple[int, str, float]]: 1-based page number, path of
+            its image and rendering time per page of its run, in seconds;
+            None before each streaming window but the first
+        """
+        if self.config.streaming:
+            window = self._streaming_window()
+        elif cancel is not None:
+            window = self.config.max_pages_in_memory
+        else:
+            window = len(page_numbers)
+        for index, run in enumerate(self._page_runs(page_numbers, window)):
+            if self.config.streaming and index:
+                yield None
+            _check_cancel(cancel)
+            start = time.perf_counter()
+            image_paths = render_pages(
+                str(pdf_path), run[0], run[-1],
+                self._render_dpi(), self.config.grayscale, temp_dir
+            )
+            seconds = (time.perf_counter() - start) / len(run)
+            for page_number, image_path in zip(run, image_paths):
+                yield page_number, image_path, seconds
+
+    def _blank_pages(self, pdf_path: Path, temp_dir: str, page_numbers: List[int],
+                     cancel: Optional[threading.Event] = None) -> Dict[int, float]:
+        """
+        Find blank pages from the ink density of low-resolution thumbnails.
+
+        Args:
+            pdf_path: PDF to inspect
+            temp_dir: Directory for the thumbnails
+            page_numbers: 1-based pages to check, ascending
+            cancel: Optional event checked before each thumbnail batch
+
+        Returns:
+            Dict[int, float]: Blank page numbers and the seconds spent
+            checking each
+        """
+        from .blank_pages import THUMBNAIL_BATCH, THUMBNAIL_DPI, ink_density
+
+        blank: Dict[int, float] = {}
+        for run in self._page_runs(page_numbers, THUMBNAIL_BATCH):
+            _check_cancel(cancel)
+            start = time.perf_counter()
+            thumbnails = render_pages(str(pdf_path), run[0], run[-1], THUMBNAIL_DPI, True, temp_dir)
+            densities = []
+            for thumbnail in thumbnails:
+                densities.append(ink_density(thumbnail))
+                os.remove(thumbnail)
+            seconds = (time.perf_counter() - start) / len(run)
+            blank.update(
+                (page_number, seconds) for page_number, density in zip(run, densities)
+                if density < self.config.blank_threshold
+            )
+        logging.info(f"{pdf_path}: {len(blank)} of {len(page_numbers)} pages are blank")
+        return blank
+
+    def _render_dpi(self) -> int:
+        """Resolution of the first rendering pass."""
+        return self.config.low_dpi if self.config.adaptive_dpi else self.config.dpi
+
+    @staticmethod
+    def _page_runs(page_numbers: List[int], window: int) -> Iterator[List[int]]:
+        """Split ascending page numbers into consecutive runs of at most ``window`` pages."""
+        run: List[int] = []
+        for page_number in page_numbers:
+            if run and (page_number != run[-1] + 1 or len(run) >= window):
+                yield run
+                run = []
+            run.append(page_number)
+        if run:
+            yield run
+
+    def _ocr_pages(self, pages: Iterable[Tuple[int, str, float]], options: PageOptions,
+                   ordered: bool = True, blank: Optional[Dict[int, float]] = None,
+                   cancel: Optional[threading.Event] = None) -> Iterator[PageResult]:
+        """
+        OCR page images on the worker pool, in parallel when more than one
+        worker is configured.
+
+        Pages are pulled from ``pages`` lazily and at most
+        ``_max_in_flight()`` of them are queued or running at a time, so the
+        renderer never gets far ahead of OCR. A ``None`` in ``pages`` marks
+        the start of a new streaming window: pages are finished first until
+        that window fits within the limit. Each image is deleted once its
+        page is done.
+
+        With ``options.auto_language``, the single language found on the
+        latest collected page is tried first on the pages submitted after it.
+
+        With ``config.dedup``, each page is fingerprinted on the pool and
+        looked up in document order. Pages matching an earlier page are not
+        submitted; they wait for that page's result and copy it, or are
+        recognized after all if that page fails. Once the document is
+        closing or ``cancel`` is set, copies are cancelled before the pages
+        they wait for and never fall back to their own OCR.
+
+        Args:
+            pages: Page numbers, image paths and render times in document
+                order, with None before each streaming window but the first
+            options: Per-document settings for the workers
+            ordered: Yield in document order rather than completion order
+            blank: Pages already known to be blank, with their detection
+                time; they are only rendered for the searchable PDF
+            cancel: Optional event that stops the work, see ``iter_pages``
+
+        Yields:
+            PageResult: One result per page
+        """
+        logging.info(f"OCR with {self.config.workers} {self.config.pool_type} workers")
+        max_in_flight = self._max_in_flight()
+        pending: Deque[Tuple[int, str, Future]] = deque()
+        render_times: Dict[int, float] = {}
+        blank = blank or {}
+        hint = options.language_hint
+        page_hashes = None
+        if self.config.dedup and not options.pdf_layer:
+            page_hashes = self._get_page_hashes()
+            settings = self._dedup_settings()
+        dedup_times: Dict[int, float] = {}
+        closed = threading.Event()
+        running: Dict[Future, None] = {}  # OCR y copias sin terminar, en orden de creación
+
+        def stopped() -> bool:
+            return closed.is_set() or (cancel is not None and cancel.is_set())
+
+        def track(future: Future) -> Future:
+            running[future] = None
+            future.add_done_callback(lambda done: running.pop(done, None))
+            if stopped():
+                future.cancel()
+            return future
+
+        def submit(page_number: int, image_path: str, fingerprint=None) -> Future:
+            if page_number in blank:
+                page_options = options._replace(blank=True)
+            else:
+                page_options = options._replace(language_hint=hint)
+            future = track(executor.submit(ocr_page, page_options, page_number, image_path))
+            if fingerprint is not None:
+                page_hashes.add(fingerprint, settings, f"{options.pdf_path}#{page_number}", future)
+            return future
+
+        def look_up(page_number: int, image_path: str, previous: Future) -> Tuple[Future, Future]:
+            # Huella en el pool; la búsqueda espera a la de la página anterior para ver sus copias
+            page: Future = Future()
+            looked_up: Future = Future()
+            fingerprinted = track(executor.submit(_fingerprint_page, image_path))
+
+            def dispatch() -> Future:
+                try:
+                    fingerprint, seconds = fingerprinted.result()
+                except Exception as e:
+                    logging.warning(f"Page {page_number}: could not fingerprint it: {e}")
+                    return submit(page_number, image_path)
+                start = time.perf_counter()
+                match = page_hashes.find(fingerprint, settings)
+                dedup_times[page_number] = seconds + time.perf_counter() - start
+                if match is None:
+                    return submit(page_number, image_path, fingerprint)
+                return track(self._reuse(
+                    page_number, *match,
+                    ocr=lambda: submit(page_number, image_path, fingerprint),
+                    stopped=stopped
+                ))
+
+            def resolve(_: Future) -> None:
+                try:
+                    if not page.set_running_or_notify_cancel():
+                        return
+                    try:
+                        own = dispatch()
+                    except Exception as e:
+                        page.set_result(PageResult(page_number, error=f"OCR failed: {e!r}"))
+                        return
+                    own.add_done_callback(lambda done: _forward(done, page, page_number))
+                finally:
+                    looked_up.set_result(None)
+
+            previous.add_done_callback(lambda _: fingerprinted.add_done_callback(resolve))
+            return track(page), looked_up
+
+        def collect() -> Iterator[PageResult]:
+            nonlocal hint
+            for result in self._with_render_time(self._drain(pending, ordered, cancel), render_times):
+                if result.page_number in dedup_times:
+                    result.timings['dedup_check'] = dedup_times.pop(result.page_number)
+                if result.language and '+' not in result.language:
+                    hint = result.language
+                yield result
+
+        executor = self._get_executor()
+        looked_up: Future = Future()
+        looked_up.set_result(None)
+        try:
+            for page in pages:
+                if page is None:
+                    while len(pending) > max_in_flight - self._streaming_window():
+                        yield from collect()
+                    continue
+                page_number, image_path, render_seconds = page
+                _check_cancel(cancel)
+                render_times[page_number] = render_seconds
+                if page_hashes is not None and page_number not in blank:
+                    future, looked_up = look_up(page_number, image_path, looked_up)
+                else:
+                    future = submit(page_number, image_path)
+                pending.append((page_number, image_path, future))
+                while len(pending) >= max_in_flight:
+                    yield from collect()
+            while pending:
+                yield from collect()
+        finally:
+            closed.set()
+            # Las copias van después de su original: se cancelan antes de que este las despierte
+            for future in reversed(tuple(running)):
+                future.cancel()
+
+    @staticmethod
+    def _reuse(page_number: int, source: str, original: Future, ocr: Callable[[], Future],
+               stopped: Callable[[], bool]) -> Future:
+        """
+        Future resolving to a copy of ``original``'s result for a duplicate page.
+
+        If ``original`` fails, or is cancelled by another document, the page
+        is recognized on its own with ``ocr`` instead. Once ``stopped()``
+        the copy is cancelled rather than recognized again.
+        """
+        copy: Future = Future()
+
+        def resolve(original: Future) -> None:
+            # Al cerrar, el original cancelado no es un fallo y su imagen ya no existe
+            if stopped():
+                copy.cancel()
+                return
+            # A partir de aquí la copia ya no se puede cancelar: como mucho termina su propio OCR
+            if not copy.set_running_or_notify_cancel():
+                return
+            if original.cancelled() or original.exception() is not None or original.result().error is not None:
+                logging.debug(f"Page {page_number}: {source} did not succeed, recognizing it on its own")
+                try:
+                    own = ocr()
+                except Exception as e:
+                    copy.set_result(PageResult(page_number, error=f"OCR failed: {e!r}"))
+                    return
+                own.add_done_callback(lambda done: _forward(done, copy, page_number))
+                return
+            result = original.result()
+            logging.debug(f"Page {page_number}: duplicate of {source}")
+            copy.set_result(PageResult(
+                page_number,
+                result.text,
+                method='dedup',
+                confidence=result.confidence,
+                dpi=result.dpi,
+                language=result.language,
+                outputs=dict(result.outputs),
+                duplicate_of=source
+            ))
+
+        original.add_done_callback(resolve)
+        return copy
+
+    def _get_page_hashes(self):
+        """Return the PageHashIndex shared by every document of this extractor."""
+        from .dedup import PageHashIndex
+
+        with self._lock:
+            if self._page_hashes is None:
+                self._page_hashes = PageHashIndex(self.config.dedup_threshold, self.config.dedup_index)
+            return self._page_hashes
+
+    def _dedup_settings(self) -> str:
+        """Settings a reused result must have been produced with."""
+        settings = {name: value for name, value in self._settings().items() if not name.startswith('dedup')}
+        return json.dumps(settings, sort_keys=True)
+
+    @staticmethod
+    def _with_render_time(results: Iterable[PageResult], render_times: Dict[int, float]) -> Iterator[PageResult]:
+        """Add each page's share of its rendering run to its stage timings."""
+        for result in results:
+            result.timings['render'] = result.timings.get('render', 0.0) + render_times.pop(result.page_number)
+            yield result
+
+    def _drain(self, pending: Deque[Tuple[int, str, Future]], ordered: bool,
+               cancel: Optional[threading.Event] = None) -> Iterator[PageResult]:
+        """Collect the oldest pending page, or every finished one when unordered."""
+        futures = [pending[0][2]] if ordered else [future for _, _, future in pending]
+        if cancel is None:
+            wait(futures, return_when=FIRST_COMPLETED)
+        else:
+            while not wait(futures, timeout=CANCEL_POLL_INTERVAL, return_when=FIRST_COMPLETED).done:
+                if cancel.is_set():
+                    raise CancelledError()
+        if ordered:
+            yield self._collect(*pending.popleft())
+            return
+        finished = [entry for entry in pending if entry[2].done()]
+        for entry in finished:
+            pending.remove(entry)
+        for entry in finished:
+            yield self._collect(*entry)
+
+    def _collect(self, page_number: int, image_path: str, future: Future) -> PageResult:
+        """Wait for a page's OCR result, keeping failures local to that page."""
+        try:
+            result = future.result()
+            if result.error:
+                logging.error(f"Page {page_number} failed: {result.error}")
+        except Exception as e:
+            logging.error(f"Page {page_number} failed: {e}")
+            result = PageResult(page_number, error=str(e))
+        result.temp_bytes += os.path.getsize(image_path)
+        os.remove(image_path)
+        return result
+
+    def _streaming_window(self) -> int:
+        """Pages rendered at once in streaming mode: half the limit, the rest stays in OCR."""
+        return max(self.config.max_pages_in_memory // 2, 1)
+
+    def _max_in_flight(self) -> int:
+        """Number of pages allowed between rendering and finished OCR."""
+        if self.config.streaming:
+            return self.config.max_pages_in_memory
+        return self.config.workers * 2
+
+    def _page_options(self, pdf_path: Path, temp_dir: str, pdf_layer: bool = False) -> PageOptions:
+        """Collect the settings workers need to process pages of one document."""
+        engine = self._engine_spec()
+        formats = list(self.config.output_formats)
+        preprocessing = list(self.config.preprocessing)
+        if pdf_layer:
+            if 'tsv' not in formats:
+                # Las cajas de palabras del TSV posicionan la capa de texto
+                formats.append('tsv')
+            # La capa de texto se coloca sobre la imagen original
+            preprocessing = [step for step in preprocessing if step not in GEOMETRIC_PREPROCESSING_STEPS]
+        options = PageOptions(
+            engine,
+            formats=tuple(formats),
+            pdf_path=str(pdf_path),
+            render_dir=temp_dir,
+            dpi=self._render_dpi(),
+            grayscale=self.config.grayscale,
+            high_dpi=self.config.dpi if self.config.adaptive_dpi else 0,
+            confidence_threshold=self.config.confidence_threshold,
+            pdf_layer=pdf_layer,
+            preprocessing=tuple(preprocessing),
+            target_text_height=self.config.target_text_height,
+            auto_language=self.config.auto_language,
+            language_fallback_confidence=self.config.language_fallback_confidence
+        )
+        if not self.config.cache_dir:
+            return options
+        return options._replace(
+            cache_dir=str(self.config.cache_dir),
+            cache_max_bytes=self.config.cache_max_size_mb * 1024 * 1024,
+            cache_salt='|'.join([
+                engine.backend,
+                engine.languages,
+                str(options.dpi),
+                str(options.grayscale),
+                str(options.high_dpi),
+                str(options.confidence_threshold),
+                ','.join(options.formats),
+                ','.join(options.preprocessing),
+                str(options.target_text_height),
+                str(options.auto_language),
+                str(options.language_fallback_confidence)
+            ])
+        )
+
+    def _engine_spec(self) -> EngineSpec:
+        """Describe the OCR engine workers should use for the current settings."""
+        return EngineSpec(
+            backend=self.config.engine,
+            tesseract_cmd=self.config.tesseract_cmd,
+            tessdata_dir=self.config.tessdata_dir,
+            languages=self.config.get_languages_string(),
+            # Varias páginas en paralelo: un hilo OpenMP por Tesseract
+            single_thread=self.config.workers > 1
+        )
+
+    def _get_executor(self) -> Executor:
+        """
+        Return the worker pool, creating it on first use.
+
+        The pool outlives a single document so its workers keep their
+        engines (and loaded language models) between calls, and documents
+        processed concurrently from several threads share it. It is rebuilt
+        only when the pool settings change.
+        """
+        key = (self.config.pool_type, self.config.workers)
+        with self._lock:
+            if self._executor is not None and self._executor_key != key:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+            if self._executor is None:
+                if self.config.pool_type == 'process':
+                    self._executor = ProcessPoolExecutor(max_workers=self.config.workers)
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.config.workers,
+                        thread_name_prefix='ocr'
+                    )
+                self._executor_key = key
+            return self._executor
+
+    def close(self) -> None:
+        """Shut down the worker pool and release the engines it holds."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+                self._executor_key = None
+            if self._page_hashes is not None:
+                self._page_hashes.close()
+                self._page_hashes = None
+
+    def __enter__(self) -> 'PDFOCRExtractor':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _report_progress(self, done: int, total: int) -> None:
+        """Forward progress as a percentage to the registered callback."""
+        if self.update_progress:
+            progress = (done / total) * 100
+            self.update_progress(progress)
@@ -0,0 +1,92 @@
+"""Incremental writers for extracted text."""
+
+import logging
+from pathlib import Path
+from typing import Dict, Optional, TextIO
+
+from .ocr_processor import PageResult
+
+
+class TextOutputWriter:
+    """
+    Appends page texts to an output file as pages complete.
+
+    Pages may be handed over in any order; they are buffered only until the
+    gap before them is filled and always reach the file in page order. The
+    file is flushed after every page so readers can follow it while the
+    document is still being processed. The result is identical to the
+    string returned by ``PDFOCRExtractor.process_pdf``.
+    """
+
+    def __init__(self, path: Path, first_page: int = 1, separator: str = '\n\n') -> None:
+        self.path = Path(path)
+        self.separator = separator
+        self.pages_written = 0
+        self._next_page = first_page
+        self._pending: Dict[int, Optional[str]] = {}
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file: Optional[TextIO] = open(self.path, 'w', encoding='utf-8')
+
+    def write(self, result: PageResult) -> None:
+        """
+        Add one page result.
+
+        Args:
+            result: Page to write; failed pages (no text) only advance the order
+        """
+        self._pending[result.page_number] = result.text
+        while self._next_page in self._pending:
+            self._append(self._pending.pop(self._next_page))
+            self._next_page += 1
+        self._file.flush()
+
+    def close(self) -> None:
+        """Write any buffered pages still waiting for a missing page, then close."""
+        if self._file is None:
+            return
+        if self._pending:
+            logging.warning(f"{self.path}: pages missing before {sorted(self._pending)[0]}")
+            for page_number in sorted(self._pending):
+                self._append(self._pending[page_number])
+            self._pending.clear()
+        self._file.close()
+        self._file = None
+
+    def _append(self, text: Optional[str]) -> None:
+        if text is None:
+            return
+        if self.pages_written:
+            self._file.write(self.separator)
+        self._file.write(text)
+        self.pages_written += 1
+
+    def __enter__(self) -> 'TextOutputWriter':
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class PageOutputsWriter:
+    """
+    Writes each page's additional Tesseract outputs (hOCR, TSV, PDF) to
+    their own files, named ``page_0001.hocr`` and so on, as pages complete.
+    """
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def write(self, result: PageResult) -> None:
+        """
+        Save the extra outputs of one page.
+
+        Args:
+            result: Page whose ``outputs`` should be written
+        """
+        for name, value in result.outputs.items():
+            path = self.directory / f"page_{result.page_number:04d}.{name}"
+            if isinstance(value, bytes):
+                path.write_bytes(value)
+            else:
+                path.write_text(value, encoding='utf-8')
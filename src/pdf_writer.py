@@ -0,0 +1,264 @@
+"""Streaming assembly of searchable (image + invisible text) PDFs.
+
+Workers turn each rendered page and its Tesseract word boxes into a page
+fragment file. ``SearchablePDFWriter`` appends fragments to the output PDF
+in page order as they arrive, so only one page is ever held in memory and
+the file on disk grows as OCR progresses. The PDF is built under a
+``.part`` name and only takes its final name once it is complete.
+"""
+
+import io
+import os
+import json
+import zlib
+import logging
+from pathlib import Path
+from typing import BinaryIO, Dict, List, Optional
+
+from .imaging import read_pnm
+
+JPEG_QUALITY = 75
+# Anchura media aproximada de un carácter de Helvetica, en unidades de cuerpo
+AVERAGE_CHAR_WIDTH = 0.5
+
+
+def _encode_image(width: int, height: int, channels: int, data: bytes):
+    """Compress raw pixels as JPEG when Pillow is available, otherwise with Flate."""
+    try:
+        from PIL import Image
+    except ImportError:
+        return 'FlateDecode', zlib.compress(data, 6)
+
+    image = Image.frombytes('L' if channels == 1 else 'RGB', (width, height), data)
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', quality=JPEG_QUALITY)
+    return 'DCTDecode', buffer.getvalue()
+
+
+def _pdf_string(text: str) -> bytes:
+    """Encode text as a PDF literal string in WinAnsiEncoding."""
+    raw = text.encode('cp1252', errors='replace')
+    return b'(' + raw.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)') + b')'
+
+
+def _text_layer(tsv: str, scale: float, page_height: float) -> bytes:
+    """Build invisible (render mode 3) text operators from Tesseract TSV word boxes."""
+    operators = [b'BT', b'3 Tr']
+    for line in tsv.splitlines()[1:]:
+        columns = line.split('\t')
+        if len(columns) < 12 or columns[0] != '5' or not columns[11].strip():
+            continue
+        left, top, width, height = (int(value) * scale for value in columns[6:10])
+        text = columns[11]
+        if width <= 0 or height <= 0:
+            continue
+        horizontal = 100 * width / (height * AVERAGE_CHAR_WIDTH * len(text))
+        operators.append(
+            f"/F0 {height:.2f} Tf {horizontal:.1f} Tz 1 0 0 1 {left:.2f} {page_height - top - height:.2f} Tm ".encode('ascii')
+            + _pdf_string(text) + b' Tj'
+        )
+    operators.append(b'ET')
+    return b'\n'.join(operators)
+
+
+def build_page_fragment(image_path: str, tsv: Optional[str], image_dpi: int,
+                        text_dpi: int, output_path: str) -> str:
+    """
+    Prepare one page of a searchable PDF.
+
+    Args:
+        image_path: Rendered page (PGM/PPM from pdftoppm)
+        tsv: Tesseract TSV for the page, or None for an image-only page
+        image_dpi: Resolution the image was rendered at
+        text_dpi: Resolution the TSV word boxes refer to
+        output_path: Where to write the fragment
+
+    Returns:
+        str: ``output_path``
+    """
+    raster = read_pnm(image_path)
+    image_filter, image_data = _encode_image(raster.width, raster.height, raster.channels, raster.data)
+    page_width = raster.width * 72 / image_dpi
+    page_height = raster.height * 72 / image_dpi
+
+    content = f"q {page_width:.2f} 0 0 {page_height:.2f} 0 0 cm /Im0 Do Q".encode('ascii')
+    if tsv:
+        content += b'\n' + _text_layer(tsv, 72 / text_dpi, page_height)
+    content = zlib.compress(content, 6)
+
+    header = {
+        'width': raster.width,
+        'height': raster.height,
+        'channels': raster.channels,
+        'filter': image_filter,
+        'page_width': round(page_width, 2),
+        'page_height': round(page_height, 2),
+        'image_length': len(image_data),
+        'content_length': len(content),
+    }
+    with open(output_path, 'wb') as f:
+        f.write(json.dumps(header).encode('ascii') + b'\n')
+        f.write(image_data)
+        f.write(content)
+    return output_path
+
+
+class SearchablePDFWriter:
+    """
+    Writes a PDF incrementally from page fragments.
+
+    Fragments may arrive in any order; each is appended as soon as every
+    page before it has been written, then deleted. Only object offsets and
+    page references are kept until ``close`` writes the page tree and
+    cross-reference table, so memory stays flat however long the document.
+
+    Pages are written to ``<path>.part``; ``close`` renames it to ``path``
+    and ``abort`` deletes it, so a failed or cancelled run never leaves a
+    truncated PDF at ``path`` nor replaces a previous one.
+    """
+
+    CATALOG, PAGES, FONT = 1, 2, 3
+
+    def __init__(self, path: Path, first_page: int = 1) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.part_path = self.path.with_name(f"{self.path.name}.part")
+        self._file: Optional[BinaryIO] = open(self.part_path, 'wb')
+        self._offsets: Dict[int, int] = {}
+        self._page_objects: List[int] = []
+        self._next_object = self.FONT + 1
+        self._next_page = first_page
+        self._pending: Dict[int, Optional[str]] = {}
+
+        self._file.write(b'%PDF-1.5\n%\xe2\xe3\xcf\xd3\n')
+        self._write_object(
+            self.FONT,
+            b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>'
+        )
+
+    @property
+    def page_count(self) -> int:
+        return len(self._page_objects)
+
+    def add_page(self, page_number: int, fragment_path: Optional[str]) -> None:
+        """
+        Hand over a page fragment.
+
+        Args:
+            page_number: 1-based page number
+            fragment_path: Fragment from build_page_fragment, or None if the
+                page could not be rendered (it is left out)
+        """
+        self._pending[page_number] = fragment_path
+        while self._next_page in self._pending:
+            fragment = self._pending.pop(self._next_page)
+            if fragment is None:
+                logging.warning(f"{self.path}: page {self._next_page} missing from searchable PDF")
+            else:
+                self._append_fragment(fragment)
+            self._next_page += 1
+        self._file.flush()
+
+    def close(self) -> None:
+        """
+        Write the page tree, catalog and cross-reference table and move the
+        PDF to its final path.
+
+        Raises:
+            RuntimeError: If a page was only partly written; the PDF is discarded
+        """
+        if self._file is None:
+            return
+        if self._pending:
+            logging.warning(f"{self.path}: pages missing before {sorted(self._pending)[0]}")
+            for page_number in sorted(self._pending):
+                fragment = self._pending[page_number]
+                # Tras un fallo, el directorio temporal puede haber desaparecido ya
+                if fragment is not None and os.path.exists(fragment):
+                    self._append_fragment(fragment)
+            self._pending.clear()
+
+        kids = ' '.join(f"{number} 0 R" for number in self._page_objects)
+        self._write_object(
+            self.PAGES,
+            f"<< /Type /Pages /Kids [{kids}] /Count {len(self._page_objects)} >>".encode('ascii')
+        )
+        self._write_object(self.CATALOG, f"<< /Type /Catalog /Pages {self.PAGES} 0 R >>".encode('ascii'))
+
+        size = self._next_object
+        missing = [number for number in range(1, size) if number not in self._offsets]
+        if missing:
+            self.abort()
+            raise RuntimeError(f"{self.path}: objects {missing} were never written, PDF discarded")
+        xref_offset = self._file.tell()
+        self._file.write(f"xref\n0 {size}\n0000000000 65535 f \n".encode('ascii'))
+        for number in range(1, size):
+            self._file.write(f"{self._offsets[number]:010d} 00000 n \n".encode('ascii'))
+        self._file.write(
+            f"trailer\n<< /Size {size} /Root {self.CATALOG} 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode('ascii')
+        )
+        self._file.close()
+        self._file = None
+        os.replace(self.part_path, self.path)
+
+    def abort(self) -> None:
+        """Discard the PDF being written; ``path`` is left untouched."""
+        if self._file is None:
+            return
+        self._file.close()
+        self._file = None
+        try:
+            os.remove(self.part_path)
+        except OSError as e:
+            logging.warning(f"Could not remove {self.part_path}: {e}")
+
+    def _append_fragment(self, fragment_path: str) -> None:
+        with open(fragment_path, 'rb') as f:
+            header = json.loads(f.readline())
+            image_data = f.read(header['image_length'])
+            content = f.read(header['content_length'])
+        os.remove(fragment_path)
+
+        image_object, content_object, page_object = self._allocate(3)
+        color_space = '/DeviceGray' if header['channels'] == 1 else '/DeviceRGB'
+        self._write_stream(
+            image_object,
+            f"/Type /XObject /Subtype /Image /Width {header['width']} /Height {header['height']} "
+            f"/ColorSpace {color_space} /BitsPerComponent 8 /Filter /{header['filter']}",
+            image_data
+        )
+        self._write_stream(content_object, "/Filter /FlateDecode", content)
+        self._write_object(
+            page_object,
+            (
+                f"<< /Type /Page /Parent {self.PAGES} 0 R "
+                f"/MediaBox [0 0 {header['page_width']} {header['page_height']}] "
+                f"/Resources << /XObject << /Im0 {image_object} 0 R >> /Font << /F0 {self.FONT} 0 R >> >> "
+                f"/Contents {content_object} 0 R >>"
+            ).encode('ascii')
+        )
+        self._page_objects.append(page_object)
+
+    def _allocate(self, count: int) -> List[int]:
+        numbers = list(range(self._next_object, self._next_object + count))
+        self._next_object += count
+        return numbers
+
+    def _write_object(self, number: int, body: bytes) -> None:
+        self._offsets[number] = self._file.tell()
+        self._file.write(f"{number} 0 obj\n".encode('ascii') + body + b'\nendobj\n')
+
+    def _write_stream(self, number: int, dictionary: str, data: bytes) -> None:
+        self._offsets[number] = self._file.tell()
+        self._file.write(f"{number} 0 obj\n<< {dictionary} /Length {len(data)} >>\nstream\n".encode('ascii'))
+        self._file.write(data)
+        self._file.write(b'\nendstream\nendobj\n')
+
+    def __enter__(self) -> 'SearchablePDFWriter':
+        return self
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
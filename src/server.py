@@ -0,0 +1,478 @@
+"""Local OCR job server.
+
+Tools on the same machine submit PDFs over HTTP, on a TCP port or a Unix
+socket, instead of loading Expapyrus themselves. Jobs are persisted in a
+SQLite queue under the data directory and processed by a fixed number of
+document threads sharing one warm ``PDFOCRExtractor``, whose worker pool
+keeps Tesseract engines and language models loaded between jobs.
+
+Endpoints:
+
+- ``POST /jobs``: submit a job, either a JSON body ``{"path": "/abs/file.pdf"}``
+  for a file the server can read or the PDF itself with
+  ``Content-Type: application/pdf``. Returns the job with status 201.
+- ``GET /jobs``: every job, newest first
+- ``GET /jobs/<id>``: status and page progress of one job
+- ``GET /jobs/<id>/result``: extracted text of a finished job
+- ``DELETE /jobs/<id>``: cancel a queued or running job
+- ``GET /metrics``: processing metrics in the Prometheus text format
+
+Jobs still running when the server stops are queued again on the next
+start and resume from their checkpoint.
+"""
+
+import os
+import sys
+import json
+import uuid
+import time
+import logging
+import sqlite3
+import argparse
+import threading
+import socketserver
+from concurrent.futures import CancelledError
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from .config import OCRConfig
+from .ocr_processor import PDFOCRExtractor
+from .output import TextOutputWriter
+from .constants import (
+    APP_TITLE,
+    APP_VERSION,
+    CHECKPOINT_SUFFIX,
+    DEFAULT_SERVER_PORT,
+    OUTPUT_SUFFIX,
+    SERVER_DATA_DIR,
+    SERVER_POLL_INTERVAL
+)
+
+MAX_UPLOAD_BYTES = 1024 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    pdf_path TEXT NOT NULL,
+    output_path TEXT NOT NULL,
+    status TEXT NOT NULL,
+    total_pages INTEGER,
+    pages_done INTEGER NOT NULL DEFAULT 0,
+    failed_pages INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+"""
+
+
+class JobStore:
+    """
+    SQLite-backed job queue.
+
+    One connection is shared by every thread and serialized with a lock;
+    each change is committed immediately so the queue survives a crash.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.executescript(SCHEMA)
+
+    def add(self, pdf_path: Path, output_path: Path, job_id: Optional[str] = None) -> Dict[str, Any]:
+        """Queue a new job."""
+        job_id = job_id or uuid.uuid4().hex
+        with self._lock:
+            self._db.execute(
+                'INSERT INTO jobs (id, pdf_path, output_path, status, created_at) VALUES (?, ?, ?, ?, ?)',
+                (job_id, str(pdf_path), str(output_path), 'queued', time.time())
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._db.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def list(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._db.execute('SELECT * FROM jobs ORDER BY created_at DESC').fetchall()
+        return [dict(row) for row in rows]
+
+    def claim(self) -> Optional[Dict[str, Any]]:
+        """Mark the oldest queued job as running and return it, None if the queue is empty."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return None
+            self._db.execute(
+                "UPDATE jobs SET status = 'running', started_at = ? WHERE id = ?",
+                (time.time(), row['id'])
+            )
+        return self.get(row['id'])
+
+    def update(self, job_id: str, **values: Any) -> None:
+        if 'status' in values and values['status'] not in ('queued', 'running'):
+            values['finished_at'] = time.time()
+        columns = ', '.join(f"{name} = ?" for name in values)
+        with self._lock:
+            self._db.execute(f'UPDATE jobs SET {columns} WHERE id = ?', (*values.values(), job_id))
+
+    def cancel_queued(self, job_id: str) -> bool:
+        """Cancel a job that has not started; False if it is no longer queued."""
+        with self._lock:
+            cursor = self._db.execute(
+                "UPDATE jobs SET status = 'cancelled', finished_at = ? WHERE id = ? AND status = 'queued'",
+                (time.time(), job_id)
+            )
+        return cursor.rowcount > 0
+
+    def requeue_running(self) -> int:
+        """Queue again the jobs left running by a previous server process."""
+        with self._lock:
+            cursor = self._db.execute("UPDATE jobs SET status = 'queued' WHERE status = 'running'")
+        return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+class JobRunner:
+    """
+    Processes queued jobs on ``jobs`` document threads with one shared extractor.
+
+    Args:
+        extractor: Warm extractor shared by every job
+        store: Job queue
+        jobs: Documents processed concurrently
+    """
+
+    def __init__(self, extractor: PDFOCRExtractor, store: JobStore, jobs: int = 2) -> None:
+        self.extractor = extractor
+        self.store = store
+        self.jobs = max(jobs, 1)
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._cancel_events: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> None:
+        requeued = self.store.requeue_running()
+        if requeued:
+            logging.info(f"Resuming {requeued} interrupted jobs")
+        for index in range(self.jobs):
+            thread = threading.Thread(target=self._work, name=f'job-{index}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def notify(self) -> None:
+        """Wake an idle document thread after a job was queued."""
+        self._wakeup.set()
+
+    def cancel(self, job_id: str) -> bool:
+        """Cancel a queued or running job; False if it already finished."""
+        # Bajo el mismo cerrojo que _work: un trabajo está en cola o tiene su evento
+        with self._lock:
+            if self.store.cancel_queued(job_id):
+                return True
+            event = self._cancel_events.get(job_id)
+        if event is None:
+            return False
+        event.set()
+        return True
+
+    def stop(self) -> None:
+        """Stop the document threads; running jobs stay queued for the next start."""
+        self._stopping.set()
+        self._wakeup.set()
+        with self._lock:
+            for event in self._cancel_events.values():
+                event.set()
+        for thread in self._threads:
+            thread.join()
+
+    def _work(self) -> None:
+        while not self._stopping.is_set():
+            with self._lock:
+                job = self.store.claim()
+                if job is not None:
+                    cancel = threading.Event()
+                    self._cancel_events[job['id']] = cancel
+            if job is None:
+                self._wakeup.wait(SERVER_POLL_INTERVAL)
+                self._wakeup.clear()
+                continue
+            self._run(job, cancel)
+
+    def _run(self, job: Dict[str, Any], cancel: threading.Event) -> None:
+        """Process a claimed job; ``cancel`` is already registered for it."""
+        job_id = job['id']
+        pdf_path = Path(job['pdf_path'])
+        output_path = Path(job['output_path'])
+        logging.info(f"Job {job_id}: processing {pdf_path}")
+        try:
+            from pdf2image import pdfinfo_from_path
+
+            self.store.update(job_id, total_pages=int(pdfinfo_from_path(pdf_path)['Pages']))
+            checkpoint_path = output_path.with_name(output_path.name + CHECKPOINT_SUFFIX)
+            pages = failed_pages = 0
+            with TextOutputWriter(output_path) as writer:
+                for result in self.extractor.iter_pages(pdf_path, checkpoint_path, ordered=False, cancel=cancel):
+                    writer.write(result)
+                    pages += 1
+                    failed_pages += result.error is not None
+                    self.store.update(job_id, pages_done=pages, failed_pages=failed_pages)
+            self.store.update(job_id, status='done')
+            logging.info(f"Job {job_id}: done ({pages} pages, {failed_pages} failed)")
+        except CancelledError:
+            # Al parar el servidor el trabajo se reanuda en el siguiente arranque
+            status = 'queued' if self._stopping.is_set() else 'cancelled'
+            self.store.update(job_id, status=status)
+            logging.info(f"Job {job_id}: {status}")
+        except Exception as e:
+            logging.error(f"Job {job_id} failed: {e}")
+            self.store.update(job_id, status='failed', error=str(e))
+        finally:
+            with self._lock:
+                del self._cancel_events[job_id]
+
+
+class JobRequestHandler(BaseHTTPRequestHandler):
+    """HTTP front end of the job queue; ``self.server.app`` is the OCRServer."""
+
+    server_version = f"{APP_TITLE}/{APP_VERSION}"
+
+    def do_GET(self) -> None:
+        parts = self._path_parts()
+        app = self.server.app
+        if parts == ['jobs']:
+            self._send_json(200, app.store.list())
+        elif parts == ['metrics']:
+            self._send(200, app.extractor.metrics.to_prometheus().encode('utf-8'), 'text/plain; version=0.0.4')
+        elif len(parts) == 2 and parts[0] == 'jobs':
+            job = app.store.get(parts[1])
+            if job is None:
+                self._send_error(404, "Job not found")
+            else:
+                self._send_json(200, job)
+        elif len(parts) == 3 and parts[0] == 'jobs' and parts[2] == 'result':
+            self._send_result(parts[1])
+        else:
+            self._send_error(404, "Not found")
+
+    def do_POST(self) -> None:
+        if self._path_parts() != ['jobs']:
+            self._send_error(404, "Not found")
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_UPLOAD_BYTES:
+            self._send_error(413, "PDF too large")
+            return
+        body = self.rfile.read(length)
+        content_type = self.headers.get('Content-Type', '').split(';')[0].strip()
+        try:
+            if content_type == 'application/pdf':
+                job = self.server.app.submit_upload(body)
+            else:
+                request = json.loads(body or b'{}')
+                job = self.server.app.submit_path(Path(request['path']))
+        except (ValueError, KeyError, TypeError) as e:
+            self._send_error(400, f"Invalid job: {e}")
+            return
+        except FileNotFoundError as e:
+            self._send_error(404, str(e))
+            return
+        self._send_json(201, job)
+
+    def do_DELETE(self) -> None:
+        parts = self._path_parts()
+        if len(parts) != 2 or parts[0] != 'jobs':
+            self._send_error(404, "Not found")
+            return
+        app = self.server.app
+        if app.store.get(parts[1]) is None:
+            self._send_error(404, "Job not found")
+        elif not app.runner.cancel(parts[1]):
+            self._send_error(409, "Job already finished")
+        else:
+            self._send_json(202, app.store.get(parts[1]))
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logging.debug(f"{self.address_string()} - {format % args}")
+
+    def _path_parts(self) -> List[str]:
+        return [part for part in self.path.split('?', 1)[0].split('/') if part]
+
+    def _send_result(self, job_id: str) -> None:
+        job = self.server.app.store.get(job_id)
+        if job is None:
+            self._send_error(404, "Job not found")
+            return
+        if job['status'] != 'done':
+            self._send_error(409, f"Job is {job['status']}")
+            return
+        try:
+            with open(job['output_path'], 'rb') as f:
+                content = f.read()
+        except OSError as e:
+            self._send_error(410, f"Result no longer available: {e}")
+            return
+        self._send(200, content, 'text/plain; charset=utf-8')
+
+    def _send_json(self, status: int, value: Any) -> None:
+        self._send(status, json.dumps(value, indent=2).encode('utf-8'), 'application/json')
+
+    def _send_error(self, status: int, message: str) -> None:
+        self._send_json(status, {'error': message})
+
+    def _send(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """HTTP server on a Unix domain socket."""
+    daemon_threads = True
+
+    def get_request(self):
+        request, _ = super().get_request()
+        # Las conexiones por socket Unix no tienen dirección de cliente
+        return request, ('unix', 0)
+
+
+class OCRServer:
+    """
+    Job queue, document threads and HTTP listener of a server process.
+
+    Args:
+        config: OCR settings used for every job
+        data_dir: Directory for the SQLite queue, uploads and results
+        jobs: Documents processed concurrently
+    """
+
+    def __init__(self, config: OCRConfig, data_dir: Path = Path(SERVER_DATA_DIR), jobs: int = 2) -> None:
+        self.data_dir = Path(data_dir)
+        self.uploads_dir = self.data_dir / 'uploads'
+        self.results_dir = self.data_dir / 'results'
+        self.uploads_dir.mkdir(parents=True, exist_ok=True)
+        self.results_dir.mkdir(parents=True, exist_ok=True)
+        self.extractor = PDFOCRExtractor(config)
+        self.store = JobStore(self.data_dir / 'jobs.sqlite3')
+        self.runner = JobRunner(self.extractor, self.store, jobs)
+        self.httpd: Optional[socketserver.BaseServer] = None
+
+    def submit_path(self, pdf_path: Path) -> Dict[str, Any]:
+        """Queue a PDF the server reads in place."""
+        pdf_path = pdf_path.resolve()
+        if not pdf_path.is_file():
+            raise FileNotFoundError(f"PDF not found: {pdf_path}")
+        return self._submit(pdf_path)
+
+    def submit_upload(self, content: bytes) -> Dict[str, Any]:
+        """Store an uploaded PDF and queue it."""
+        if not content.startswith(b'%PDF'):
+            raise ValueError("Body is not a PDF")
+        job_id = uuid.uuid4().hex
+        pdf_path = self.uploads_dir / f"{job_id}.pdf"
+        pdf_path.write_bytes(content)
+        return self._submit(pdf_path, job_id)
+
+    def _submit(self, pdf_path: Path, job_id: Optional[str] = None) -> Dict[str, Any]:
+        job_id = job_id or uuid.uuid4().hex
+        job = self.store.add(pdf_path, self.results_dir / f"{job_id}{OUTPUT_SUFFIX}", job_id)
+        self.runner.notify()
+        logging.info(f"Job {job_id} queued: {pdf_path}")
+        return job
+
+    def serve(self, host: str = '127.0.0.1', port: int = DEFAULT_SERVER_PORT,
+              socket_path: Optional[str] = None) -> None:
+        """Start the document threads and serve requests until interrupted."""
+        if socket_path:
+            if os.path.exists(socket_path):
+                os.remove(socket_path)
+            self.httpd = UnixHTTPServer(socket_path, JobRequestHandler)
+            address = socket_path
+        else:
+            self.httpd = ThreadingHTTPServer((host, port), JobRequestHandler)
+            address = f"http://{host}:{self.httpd.server_address[1]}"
+        self.httpd.app = self
+        self.runner.start()
+        logging.info(f"{APP_TITLE} server listening on {address}")
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Stop accepting requests and jobs, keeping unfinished jobs queued."""
+        if self.httpd is not None:
+            self.httpd.server_close()
+            if isinstance(self.httpd, UnixHTTPServer) and os.path.exists(self.httpd.server_address):
+                os.remove(self.httpd.server_address)
+            self.httpd = None
+        self.runner.stop()
+        self.extractor.close()
+        self.store.close()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the server's command-line argument parser."""
+    parser = argparse.ArgumentParser(
+        prog='expapyrus-server',
+        description=f"{APP_TITLE} {APP_VERSION} - local OCR job server"
+    )
+    parser.add_argument('--host', default='127.0.0.1', help="Address to listen on (default: 127.0.0.1)")
+    parser.add_argument('--port', type=int, default=DEFAULT_SERVER_PORT,
+                        help=f"TCP port to listen on (default: {DEFAULT_SERVER_PORT})")
+    parser.add_argument('--socket', help="Listen on this Unix socket instead of TCP")
+    parser.add_argument('--data-dir', type=Path, default=Path(SERVER_DATA_DIR),
+                        help=f"Directory for the job queue, uploads and results (default: {SERVER_DATA_DIR})")
+    parser.add_argument('-j', '--jobs', type=int, default=2,
+                        help="Documents processed concurrently (default: 2)")
+    parser.add_argument('-w', '--workers', type=int,
+                        help="Pages OCR'd concurrently across all jobs (default: CPU count)")
+    parser.add_argument('-l', '--languages', help="Tesseract languages, e.g. eng+spa")
+    parser.add_argument('--tesseract-cmd', help="Path to the tesseract executable")
+    parser.add_argument('--tessdata-dir', help="Path to the tessdata directory")
+    parser.add_argument('-q', '--quiet', action='store_true', help="Only log warnings and errors")
+    return parser
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the job server until interrupted."""
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(
+        level=logging.WARNING if args.quiet else logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    overrides = {
+        'workers': args.workers,
+        'languages': args.languages,
+        'tesseract_cmd': args.tesseract_cmd,
+        'tessdata_dir': args.tessdata_dir,
+    }
+    config = OCRConfig({key: value for key, value in overrides.items() if value is not None})
+    server = OCRServer(config, args.data_dir, args.jobs)
+    try:
+        server.serve(args.host, args.port, args.socket)
+    except KeyboardInterrupt:
+        logging.info("Server stopped")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())